@@ -0,0 +1,421 @@
+"""The portfolio assistant as one reusable, Streamlit-free service.
+
+Both chat widgets (and the benchmarks) go through a single
+``AssistantService`` per process. It owns knowledge loading, FAQ
+short-circuiting, retrieval and prompt construction, model and TTS calls
+with their caches, and the three response modes. Retrieval and
+transcription (and the NumPy they need) are imported on first use.
+"""
+import time
+import wave
+from dataclasses import dataclass, field
+
+from faq_match import get_faq_matcher
+from faq_precompute import FAQ_ARTIFACT_DIR, get_precomputed_faq
+from knowledge import knowledge_stats, load_knowledge
+from prompting import PromptBudget, build_prompt
+from providers import (
+    ProviderUnavailable, admission_stats, breaker_stats, call_with_retries, configure_provider_limits,
+    get_http_session, get_openai_client,
+)
+from response_cache import get_response_cache, prompt_fingerprint
+from shared import process_wide
+from singleflight import SingleFlight
+from speech import ELEVEN_BASE_URL, TtsPipeline, elevenlabs_tts, get_audio_cache
+from telemetry import metrics, new_request_id, span
+
+TEXT_ONLY = "Text only"
+SPEECH_ONLY = "Speech only"
+TEXT_AND_SPEECH = "Text & Speech"
+RESPONSE_TYPES = [TEXT_ONLY, SPEECH_ONLY, TEXT_AND_SPEECH]
+
+CHAT_PROMPT_TEMPLATE = (
+    "You are {name}'s AI assistant. Respond with warmth, empathy, and a positive tone. "
+    "Always consider the FAQ entries (Q:/A:) in the context and use them to answer questions when relevant. "
+    "If a question matches or relates to the FAQ, use the FAQ answer, but feel free to add a personal, sentimental touch. "
+    "If the FAQ does not cover the question, answer thoughtfully and helpfully."
+)
+ASSISTANT_PROMPT_TEMPLATE = """You are {name}'s AI assistant. Answer questions professionally and concisely.\nMatch user questions to FAQ data semantically. Prioritize FAQ answers when available."""
+CHAT_SYSTEM_PROMPT = CHAT_PROMPT_TEMPLATE.format(name="Claire")
+ASSISTANT_SYSTEM_PROMPT = ASSISTANT_PROMPT_TEMPLATE.format(name="Claire Namusoke")
+BUSY_MESSAGE = "I'm answering a lot of questions right now. Please try again in a moment."
+NO_API_KEY_MESSAGE = "API key not configured. Please check your Streamlit secrets file and restart the app."
+RETRIEVAL_CANDIDATES = 10  # chunks fetched before the token budget trims them
+
+
+def _flag(value):
+    """Boolean setting from TOML (true/false) or a string such as an env var ("0", "false", "no", "off")."""
+    if isinstance(value, str):
+        return value.strip().lower() not in ("", "0", "false", "no", "off")
+    return bool(value)
+
+
+@dataclass(frozen=True)
+class AssistantSettings:
+    openai_api_key: str = None
+    openai_model: str = "gpt-4o-mini"
+    openai_base_url: str = None
+    openai_timeout: float = 30
+    eleven_api_key: str = None
+    eleven_voice_id: str = None
+    eleven_base_url: str = ELEVEN_BASE_URL
+    eleven_timeout: float = 30
+    embedding_backend: str = "openai"
+    faq_match_threshold: float = 0.85
+    faq_artifact_dir: str = FAQ_ARTIFACT_DIR
+    response_cache_db: str = None
+    response_cache_size: int = 512
+    response_cache_ttl: int = 24 * 3600
+    stream_responses: bool = True
+    tts_cache_dir: str = ".cache/tts"
+    tts_cache_max_mb: int = 200
+    openai_concurrency: int = 8
+    eleven_concurrency: int = 4
+    openai_rate: float = 10.0  # requests/second, process-wide
+    eleven_rate: float = 10.0
+    queue_timeout: float = 10  # longest wait for a provider before answering "busy"
+    prompt_budget: PromptBudget = field(default_factory=PromptBudget)
+    temperature: float = 0.2
+    max_tokens: int = 800
+
+    @classmethod
+    def from_secrets(cls, secrets):
+        """Build settings from st.secrets or any dict of the same keys."""
+        return cls(
+            openai_api_key=secrets.get("OPENAI_API_KEY"),
+            openai_model=secrets.get("OPENAI_MODEL", "gpt-4o-mini"),
+            openai_base_url=secrets.get("OPENAI_BASE_URL"),  # None uses api.openai.com; set for a local stand-in
+            openai_timeout=float(secrets.get("OPENAI_TIMEOUT", 30)),
+            eleven_api_key=secrets.get("ELEVEN_API_KEY"),
+            eleven_voice_id=secrets.get("ELEVEN_VOICE_ID"),
+            eleven_base_url=secrets.get("ELEVEN_BASE_URL", ELEVEN_BASE_URL),
+            eleven_timeout=float(secrets.get("ELEVEN_TIMEOUT", 30)),
+            embedding_backend=secrets.get("EMBEDDING_BACKEND", "openai"),  # "openai" or "hashing" (offline)
+            faq_match_threshold=float(secrets.get("FAQ_MATCH_THRESHOLD", 0.85)),  # confidence needed to skip the LLM
+            faq_artifact_dir=secrets.get("FAQ_ARTIFACT_DIR", FAQ_ARTIFACT_DIR),  # built by faq_precompute.py
+            response_cache_db=secrets.get("RESPONSE_CACHE_DB"),  # e.g. "response_cache.sqlite3"; in-memory only if unset
+            response_cache_size=int(secrets.get("RESPONSE_CACHE_SIZE", 512)),
+            response_cache_ttl=int(secrets.get("RESPONSE_CACHE_TTL", 24 * 3600)),
+            stream_responses=_flag(secrets.get("STREAM_RESPONSES", True)),  # False falls back to blocking completions
+            tts_cache_dir=secrets.get("TTS_CACHE_DIR", ".cache/tts"),
+            tts_cache_max_mb=int(secrets.get("TTS_CACHE_MAX_MB", 200)),
+            openai_concurrency=int(secrets.get("OPENAI_CONCURRENCY", 8)),
+            eleven_concurrency=int(secrets.get("ELEVEN_CONCURRENCY", 4)),
+            openai_rate=float(secrets.get("OPENAI_RATE", 10.0)),
+            eleven_rate=float(secrets.get("ELEVEN_RATE", 10.0)),
+            queue_timeout=float(secrets.get("PROVIDER_QUEUE_TIMEOUT", 10)),
+            prompt_budget=PromptBudget(
+                context=int(secrets.get("PROMPT_CONTEXT_TOKENS", 1500)),
+                history=int(secrets.get("PROMPT_HISTORY_TOKENS", 600)),
+            ),
+        )
+
+    @property
+    def tts_enabled(self):
+        return bool(self.eleven_api_key and self.eleven_voice_id)
+
+
+class ReplyStream:
+    """Collects one answer's streamed output; jobs.Job has the same attributes."""
+
+    def __init__(self):
+        self.partial = []
+        self.segments = []
+        self.meta = {}
+        self.cancelled = False
+
+
+class AssistantService:
+    """Answers visitor questions; safe to share across sessions and threads."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        configure_provider_limits(
+            {"openai": settings.openai_concurrency, "elevenlabs": settings.eleven_concurrency},
+            rates={"openai": (settings.openai_rate, max(1, int(2 * settings.openai_rate))),
+                   "elevenlabs": (settings.eleven_rate, max(1, int(2 * settings.eleven_rate)))},
+            queue_timeout=settings.queue_timeout,
+        )
+        self.flights = SingleFlight()
+        self.response_cache = get_response_cache(
+            settings.response_cache_db, settings.response_cache_size, settings.response_cache_ttl
+        )
+        self.tts_cache = get_audio_cache(settings.tts_cache_dir, settings.tts_cache_max_mb * 1024 * 1024)
+        self.embedder = None
+        if settings.openai_api_key and settings.embedding_backend == "openai":
+            from retrieval import OpenAIEmbedder
+            self.embedder = OpenAIEmbedder(settings.openai_api_key, base_url=settings.openai_base_url)
+        metrics.add_collector("response_cache", self.response_cache.snapshot)
+        metrics.add_collector("tts_cache", self.tts_cache.snapshot)
+        metrics.add_collector("knowledge", knowledge_stats)
+        metrics.add_collector("singleflight", self.flights.snapshot)
+        metrics.add_collector("admission", lambda: {
+            f"{provider}_{key}": value for provider, q in admission_stats().items() for key, value in q.items()
+        })
+
+    # ---------- Model calls ----------
+    def _openai(self):
+        return get_openai_client(self.settings.openai_api_key, self.settings.openai_base_url)
+
+    def _cache_key(self, system_prompt, messages, version=None):
+        s = self.settings
+        version = version or load_knowledge().version
+        return prompt_fingerprint(s.openai_model, system_prompt, messages, s.temperature, s.max_tokens, version)
+
+    def _messages(self, system_prompt, messages):
+        return [{"role": "system", "content": system_prompt}] + messages
+
+    def _complete(self, system_prompt, messages, key):
+        s = self.settings
+        client = self._openai()
+        resp = call_with_retries("openai", lambda: client.chat.completions.create(
+            model=s.openai_model,
+            messages=self._messages(system_prompt, messages),
+            temperature=s.temperature,
+            max_tokens=s.max_tokens,
+            timeout=s.openai_timeout,
+        ))
+        answer = resp.choices[0].message.content
+        self.response_cache.set(key, answer)
+        return answer
+
+    def _stream(self, system_prompt, messages):
+        s = self.settings
+        client = self._openai()
+        # The provider slot is held until the stream is read to the end or closed
+        stream = call_with_retries("openai", lambda: client.chat.completions.create(
+            model=s.openai_model,
+            messages=self._messages(system_prompt, messages),
+            temperature=s.temperature,
+            max_tokens=s.max_tokens,
+            stream=True,
+            timeout=s.openai_timeout,
+        ), stream=True)
+        try:
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            stream.close()
+
+    def complete(self, system_prompt, messages, key=None):
+        """Blocking completion that raises on provider errors (for batch jobs).
+
+        Identical prompts already in flight share that call's answer.
+        """
+        key = key or self._cache_key(system_prompt, messages)
+        return self.flights.do(("chat", key), lambda: self._complete(system_prompt, messages, key))
+
+    def chat_completion(self, system_prompt, messages, version=None):
+        """Blocking completion; errors come back as text and are not cached.
+
+        ``version`` is the knowledge version the prompt was built from (the
+        default portfolio's if None); it is part of the cache key.
+        """
+        key = self._cache_key(system_prompt, messages, version)
+        cached = self.response_cache.get(key)
+        metrics.inc("cache_requests_total", cache="response", result="miss" if cached is None else "hit")
+        if cached is not None:
+            return cached
+        try:
+            return self.complete(system_prompt, messages, key)
+        except ProviderUnavailable:
+            metrics.inc("busy_replies_total", provider="openai")
+            return BUSY_MESSAGE
+        except Exception as e:
+            metrics.inc("errors_total", stage="llm")
+            return f"Error contacting OpenAI: {e}"
+
+    def chat_completion_stream(self, system_prompt, messages, version=None):
+        """Yield the answer incrementally; the full text is cached once complete.
+
+        Identical prompts already streaming share that stream token by token.
+        """
+        key = self._cache_key(system_prompt, messages, version)
+        cached = self.response_cache.get(key)
+        metrics.inc("cache_requests_total", cache="response", result="miss" if cached is None else "hit")
+        if cached is not None:
+            yield cached
+            return
+        parts = []
+        try:
+            for delta in self.flights.stream(("stream", key), lambda: self._stream(system_prompt, messages)):
+                parts.append(delta)
+                yield delta
+        except ProviderUnavailable:
+            metrics.inc("busy_replies_total", provider="openai")
+            yield BUSY_MESSAGE if not parts else f"\n\n({BUSY_MESSAGE})"
+            return
+        except Exception as e:
+            metrics.inc("errors_total", stage="llm")
+            if not parts:
+                # Nothing streamed yet: fall back to the blocking call
+                yield self.chat_completion(system_prompt, messages, version)
+            else:
+                yield f"\n\n(Error contacting OpenAI: {e})"
+            return
+        self.response_cache.set(key, "".join(parts))
+
+    def synthesize(self, text, request_id=None, voice_id=None):
+        """Cached TTS for one piece of text (raises on provider errors).
+
+        The same sentence requested by several sessions at once is synthesized once.
+        """
+        s = self.settings
+        voice_id = voice_id or s.eleven_voice_id
+
+        def fetch():
+            return self.tts_cache.fetch(
+                text, voice_id,
+                lambda t: call_with_retries("elevenlabs", lambda: elevenlabs_tts(
+                    t, s.eleven_api_key, voice_id, base_url=s.eleven_base_url,
+                    timeout=s.eleven_timeout, session=get_http_session(),
+                )),
+            )
+
+        with span("tts", request_id, chars=len(text)) as fields:
+            misses = self.tts_cache.stats["misses"]
+            audio = self.flights.do(("tts", voice_id, text), fetch)
+            # Approximate under concurrency, good enough for a log field
+            fields["cached"] = self.tts_cache.stats["misses"] == misses
+        return audio
+
+    def transcribe(self, audio, request_id=None):
+        """Transcribe a (filename, bytes, MIME type) recording; WAV input is split at pauses. Returns (text, metrics)."""
+        from transcription import openai_transcribe, transcribe_wav_incrementally
+        filename, audio_bytes, mime = audio
+        client = self._openai()
+        timeout = self.settings.openai_timeout
+        with span("transcription", request_id, bytes=len(audio_bytes)):
+            try:
+                return transcribe_wav_incrementally(audio_bytes, lambda wav: openai_transcribe(wav, client, timeout=timeout))
+            except wave.Error:
+                # Not a WAV file: upload it in one piece, as what it is
+                return openai_transcribe(audio_bytes, client, filename=filename, mime=mime, timeout=timeout), None
+
+    # ---------- Answering ----------
+    def answer(self, question, response_type=TEXT_ONLY, system_prompt=CHAT_SYSTEM_PROMPT, history=(),
+               audio=None, out=None, tenant=None):
+        """Answer one question, streaming into ``out`` (a ReplyStream or jobs.Job).
+
+        Text tokens are appended to ``out.partial`` and audio segments, in
+        playback order, to ``out.segments``. With ``audio`` (a recording as
+        a (filename, bytes, MIME type) tuple) the question is transcribed first. ``tenant`` (see tenants.py)
+        selects the portfolio's knowledge, FAQ artifact and voice; None
+        uses the default assets. Returns a result dict, or None if the
+        request was cancelled or nothing could be transcribed.
+        """
+        out = out if out is not None else ReplyStream()
+        s = self.settings
+        snapshot = tenant.knowledge() if tenant else load_knowledge()
+        artifact_dir = tenant.faq_artifact_dir(s.faq_artifact_dir) if tenant else s.faq_artifact_dir
+        voice_id = tenant.voice_id if tenant else None
+        request_id = out.meta.setdefault("request_id", new_request_id())
+        timings = {}
+        start = time.perf_counter()
+        if audio is not None:
+            question, transcript_metrics = self.transcribe(audio, request_id)
+            out.meta["transcription_metrics"] = transcript_metrics
+            timings["transcription"] = time.perf_counter() - start
+            if not question:
+                return None
+            out.meta["question"] = question
+        # FAQ questions (and pre-computed paraphrases) are answered locally without calling the model
+        with span("faq_match", request_id):
+            precomputed = get_precomputed_faq(snapshot, artifact_dir, s.faq_match_threshold)
+            precomputed_hit = precomputed.match(question) if precomputed else None
+            faq_hit = None if precomputed_hit else get_faq_matcher(s.faq_match_threshold, snapshot).match(question)
+        if not (precomputed_hit or faq_hit or s.openai_api_key):
+            out.partial.append(NO_API_KEY_MESSAGE)
+            metrics.inc("requests_total", source="unconfigured")
+            return {"question": question, "answer": NO_API_KEY_MESSAGE, "source": None, "request_id": request_id}
+        wants_speech = response_type in (SPEECH_ONLY, TEXT_AND_SPEECH) and s.tts_enabled
+        pipeline, ready_audio = None, None
+        if precomputed_hit and wants_speech:
+            # Clips built for another voice (e.g. since changed in the secrets) are spoken live
+            ready_audio = precomputed.audio(precomputed_hit[0], voice_id or s.eleven_voice_id)
+        if wants_speech and not ready_audio:
+            # Sentences are synthesized concurrently while the answer is still streaming
+            pipeline = TtsPipeline(lambda text: self.synthesize(text, request_id, voice_id))
+        prompt_report = None
+        if precomputed_hit:
+            tokens, source = [precomputed_hit[0]["answer"]], "faq_precomputed"
+        elif faq_hit:
+            tokens, source = [faq_hit.answer], "faq"
+        else:
+            # Relevant chunks plus recent turns, each held to its token budget
+            from retrieval import retrieve_chunks
+            with span("context", request_id) as fields:
+                chunks = retrieve_chunks(question, embedder=self.embedder, k=RETRIEVAL_CANDIDATES, snapshot=snapshot)
+                fields["chunks"] = len(chunks)
+            with span("prompt_build", request_id) as fields:
+                system_prompt, messages, prompt_report = build_prompt(system_prompt, question, chunks, history, s.prompt_budget)
+                fields["tokens"] = prompt_report["total"]
+            out.meta["prompt_tokens"] = prompt_report
+            if s.stream_responses:
+                tokens = self.chat_completion_stream(system_prompt, messages, snapshot.version)
+            else:
+                tokens = [self.chat_completion(system_prompt, messages, snapshot.version)]
+            source = "llm"
+        metrics.inc("requests_total", source=source)
+        # Streaming time, including feeding sentences to the TTS pipeline
+        with span("llm" if source == "llm" else "faq_answer", request_id) as fields:
+            if ready_audio:
+                out.segments.append(ready_audio)
+            llm_start = time.perf_counter()
+            for token in tokens:
+                if out.cancelled:
+                    fields["cancelled"] = True
+                    return None
+                if not out.partial:
+                    timings["first_token"] = time.perf_counter() - start
+                    metrics.observe("first_token_seconds", timings["first_token"], source=source)
+                out.partial.append(token)
+                if pipeline:
+                    pipeline.feed(token)
+                    out.segments.extend(pipeline.ready())
+            timings["llm"] = time.perf_counter() - llm_start
+        if pipeline:
+            with span("tts_drain", request_id) as fields:
+                for segment in pipeline.segments():
+                    if out.cancelled:
+                        fields["cancelled"] = True
+                        return None
+                    out.segments.append(segment)
+        timings["total"] = time.perf_counter() - start
+        metrics.observe("request_seconds", timings["total"], source=source)
+        return {
+            "question": question,
+            "answer": "".join(out.partial),
+            "source": source,
+            "request_id": request_id,
+            "prompt_tokens": prompt_report,
+            "tts_metrics": pipeline.metrics if pipeline else None,
+            "timings": timings,
+        }
+
+    def run_job(self, job, question, response_type, system_prompt, history, audio=None, tenant=None):
+        """jobs.JobManager entry point."""
+        return self.answer(question, response_type, system_prompt, history, audio=audio, out=job, tenant=tenant)
+
+    def stats(self, tenant=None):
+        """Process-wide counters for the operator panel; the FAQ artifact is the tenant's (built-in if None)."""
+        s = self.settings
+        snapshot = tenant.knowledge() if tenant else load_knowledge()
+        artifact_dir = tenant.faq_artifact_dir(s.faq_artifact_dir) if tenant else s.faq_artifact_dir
+        precomputed = get_precomputed_faq(snapshot, artifact_dir, s.faq_match_threshold)
+        return {
+            "faq_artifact": {"version": precomputed.version, "entries": len(precomputed.entries)} if precomputed else None,
+            "knowledge_base": knowledge_stats(),
+            "response_cache": self.response_cache.snapshot(),
+            "tts_audio_cache": self.tts_cache.snapshot(),
+            "circuit_breakers": breaker_stats(),
+            "provider_queues": admission_stats(),
+            "coalescing": self.flights.snapshot(),
+        }
+
+
+def get_assistant(settings):
+    """Return the process-wide AssistantService for these settings."""
+    return process_wide("assistant", AssistantService, settings)
@@ -0,0 +1,63 @@
+"""Process-wide store for generated audio clips.
+
+Chat messages keep only a clip id; the bytes live here once, deduplicated
+by content hash, and the least recently used clips are evicted when the
+store grows past its byte budget.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from shared import process_wide
+
+AUDIO_STORE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class AudioStore:
+    """Bounded LRU of audio bytes keyed by content hash."""
+
+    def __init__(self, max_bytes=AUDIO_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.stats = {"puts": 0, "hits": 0, "misses": 0, "evictions": 0}
+        self._clips = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def put(self, audio):
+        """Store a clip and return its id."""
+        clip_id = hashlib.sha256(audio).hexdigest()[:16]
+        with self._lock:
+            self.stats["puts"] += 1
+            if clip_id in self._clips:
+                self._clips.move_to_end(clip_id)
+                return clip_id
+            self._clips[clip_id] = audio
+            self._total += len(audio)
+            while self._total > self.max_bytes and len(self._clips) > 1:
+                _, old = self._clips.popitem(last=False)
+                self._total -= len(old)
+                self.stats["evictions"] += 1
+        return clip_id
+
+    def get(self, clip_id):
+        """Clip bytes, or None if the id is unknown or was evicted."""
+        with self._lock:
+            audio = self._clips.get(clip_id)
+            if audio is None:
+                self.stats["misses"] += 1
+                return None
+            self._clips.move_to_end(clip_id)
+            self.stats["hits"] += 1
+            return audio
+
+    def snapshot(self):
+        with self._lock:
+            info = dict(self.stats)
+            info["clips"] = len(self._clips)
+            info["bytes"] = self._total
+        return info
+
+
+def get_audio_store(max_bytes=AUDIO_STORE_MAX_BYTES):
+    """Return the process-wide AudioStore, creating it on first use."""
+    return process_wide("audio_store", AudioStore, max_bytes)
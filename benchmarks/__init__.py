@@ -0,0 +1 @@
+"""Offline benchmarks for the portfolio assistant. Run from the repo root with ``python -m benchmarks.<name>``."""
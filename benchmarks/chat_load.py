@@ -0,0 +1,178 @@
+"""Chat request path under load, against mock OpenAI and ElevenLabs servers.
+
+Drives the same path as ``process_user_message()`` without a browser:
+each simulated visitor submits a chat job to a JobManager running
+``AssistantService.run_job`` and waits for it, then asks the next
+question. Reports p50/p95/p99 time to first token, total latency, time to
+first audio and prompt tokens, plus throughput, for each concurrency level.
+
+    python -m benchmarks.chat_load --concurrency 1 4 16 --output chat_load.json
+    python -m benchmarks.chat_load --baseline chat_load.json
+"""
+import argparse
+import itertools
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from assistant import CHAT_SYSTEM_PROMPT, TEXT_AND_SPEECH, TEXT_ONLY, AssistantSettings, AssistantService
+from benchmarks.mock_servers import mock_openai_server, mock_tts_server
+from jobs import JobManager
+
+QUESTIONS = [
+    "Which tools did you use for the shipping emissions analysis",
+    "How did you get into data analytics",
+    "What did you learn from your Power BI projects",
+    "Tell me about your chartering studies in Bremen",
+]
+PERCENTILES = (50, 95, 99)
+COMPARED = ("ttft", "latency", "tts_first_audio")
+
+
+def summarize(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+
+
+def run_level(service, concurrency, requests_per_visitor, response_type, job_workers, counter, same_question=False):
+    """Closed loop: ``concurrency`` visitors, each asking questions back to back.
+
+    ``counter`` numbers the questions; it is shared by every level of a run
+    so no level repeats a question an earlier one already cached.
+    """
+    manager = JobManager(job_workers)
+    samples = []
+    lock = threading.Lock()
+
+    def visitor(_):
+        for _ in range(requests_per_visitor):
+            with lock:
+                n = next(counter)
+            # Unique wording so the response cache never short-circuits the model,
+            # unless measuring how a burst of one shared question is coalesced
+            question = f"{QUESTIONS[0]}?" if same_question else f"{QUESTIONS[n % len(QUESTIONS)]} (visitor question {n})?"
+            submitted = time.perf_counter()
+            job = manager.submit("bench", "chat", timed_run, question, response_type, CHAT_SYSTEM_PROMPT, [],
+                                 meta={"submitted": submitted})
+            job.future.result()
+            sample = {"latency": time.perf_counter() - submitted, "error": job.error}
+            result = job.result or {}
+            queued = job.meta.get("started", submitted) - submitted
+            timings = result.get("timings") or {}
+            if "first_token" in timings:
+                sample["ttft"] = queued + timings["first_token"]
+            tts = result.get("tts_metrics") or {}
+            if tts.get("time_to_first_audio") is not None:
+                sample["tts_first_audio"] = queued + tts["time_to_first_audio"]
+            if result.get("prompt_tokens"):
+                sample["prompt_tokens"] = result["prompt_tokens"]["total"]
+            with lock:
+                samples.append(sample)
+
+    def timed_run(job, *args):
+        job.meta["started"] = time.perf_counter()
+        return service.run_job(job, *args)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(visitor, range(concurrency)))
+    wall = time.perf_counter() - start
+    manager.executor.shutdown()
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s["error"]),
+        "wall_seconds": wall,
+        "throughput_rps": len(samples) / wall,
+        "ttft": summarize(s.get("ttft") for s in samples),
+        "latency": summarize(s["latency"] for s in samples),
+        "tts_first_audio": summarize(s.get("tts_first_audio") for s in samples),
+        "prompt_tokens": summarize(s.get("prompt_tokens") for s in samples),
+    }
+
+
+def compare(results, baseline):
+    """Percent change of each percentile against a previous results file."""
+    old_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    changes = {}
+    for level in results["levels"]:
+        old = old_levels.get(level["concurrency"])
+        if not old:
+            continue
+        for metric in COMPARED + ("throughput_rps",):
+            new_value, old_value = level.get(metric), old.get(metric)
+            if not new_value or not old_value:
+                continue
+            if metric == "throughput_rps":
+                changes[f"c{level['concurrency']}.{metric}"] = 100 * (new_value / old_value - 1)
+                continue
+            for p in PERCENTILES:
+                changes[f"c{level['concurrency']}.{metric}.p{p}"] = 100 * (new_value[f"p{p}"] / old_value[f"p{p}"] - 1)
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--requests", type=int, default=5, help="questions per visitor at each level")
+    parser.add_argument("--mode", choices=["text", "speech"], default="speech",
+                        help="text only, or text & speech (adds the TTS pipeline)")
+    parser.add_argument("--job-workers", type=int, default=8)
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="mock LLM latency before the first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="mock LLM delay between tokens (s)")
+    parser.add_argument("--tts-latency", type=float, default=0.15, help="base mock TTS latency (s)")
+    parser.add_argument("--openai-rate", type=float, default=AssistantSettings.openai_rate, help="admitted OpenAI calls/s")
+    parser.add_argument("--eleven-rate", type=float, default=AssistantSettings.eleven_rate, help="admitted TTS calls/s")
+    parser.add_argument("--same-question", action="store_true", help="every visitor asks the same question")
+    parser.add_argument("--embeddings", choices=["hashing", "openai"], default="hashing")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    response_type = TEXT_AND_SPEECH if args.mode == "speech" else TEXT_ONLY
+    with mock_openai_server(args.first_token_latency, args.token_latency) as llm, \
+            mock_tts_server(base_latency=args.tts_latency) as tts, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        settings = AssistantSettings(
+            openai_api_key="test-key",
+            openai_base_url=llm.url + "/v1",
+            eleven_api_key="test-key",
+            eleven_voice_id="voice",
+            eleven_base_url=tts.url,
+            embedding_backend=args.embeddings,
+            openai_rate=args.openai_rate,
+            eleven_rate=args.eleven_rate,
+            tts_cache_dir=cache_dir,
+        )
+        service = AssistantService(settings)
+        counter = itertools.count()
+        levels = [
+            run_level(service, c, args.requests, response_type, args.job_workers, counter, args.same_question)
+            for c in args.concurrency
+        ]
+        provider_calls = {"openai": llm.server.requests, "elevenlabs": tts.server.requests}
+    stats = service.stats()
+    results = {
+        "settings": vars(args),
+        "levels": levels,
+        "provider_calls": provider_calls,
+        "provider_queues": stats["provider_queues"],
+        "coalescing": stats["coalescing"],
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["change_percent"] = compare(results, json.load(f))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
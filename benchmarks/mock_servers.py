@@ -0,0 +1,166 @@
+"""Local stand-ins for the provider APIs, with configurable latency."""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # pooled client connections closing at exit
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _count(self):
+        with self.server.lock:
+            self.server.requests += 1
+            return self.server.requests
+
+    def _track(self, delta):
+        with self.server.lock:
+            self.server.active += delta
+            self.server.max_active = max(self.server.max_active, self.server.active)
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MockServer:
+    """Runs a handler class on a background ThreadingHTTPServer."""
+
+    def __init__(self, handler, **settings):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.settings = settings
+        self.server.requests = 0
+        self.server.active = 0  # requests being answered right now
+        self.server.max_active = 0
+        self.server.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MockTtsHandler(_MockHandler):
+    """ElevenLabs-style TTS: latency and audio size grow with the text length."""
+
+    def do_POST(self):
+        settings = self.server.settings
+        n = self._count()
+        text = self._read_json().get("text", "")
+        if n <= settings.get("fail_first", 0):
+            self._send(503, b'{"detail": "overloaded"}', "application/json")
+            return
+        time.sleep(settings.get("base_latency", 0.15) + settings.get("per_char_latency", 0.002) * len(text))
+        # ~ 1 KB of 128 kbps "MP3" per 15 characters of text
+        audio = b"\xff\xfb" * (600 + 35 * len(text))
+        self._send(200, audio, "audio/mpeg")
+
+
+def mock_tts_server(base_latency=0.15, per_char_latency=0.002, fail_first=0):
+    """fail_first: answer the first N requests with 503, to exercise retries."""
+    return MockServer(MockTtsHandler, base_latency=base_latency, per_char_latency=per_char_latency, fail_first=fail_first)
+
+
+MOCK_ANSWER = (
+    "The Maven Market dashboard was my first project, completed as a bonus after finishing my Power BI class. "
+    "While it challenged me as a beginner, those challenges strengthened my skills. "
+    "I cleaned the data with Power Query and built DAX measures for the key metrics. "
+    "Ultimately it encouraged me to dive deeper into data analytics and build more dashboards."
+)
+
+
+class MockOpenAIHandler(_MockHandler):
+    """OpenAI-style chat completions (blocking and SSE streaming) and embeddings.
+
+    Each answer is tagged with the request number so response and audio
+    caches downstream do not turn repeated benchmark runs into hits.
+    """
+
+    def do_POST(self):
+        n = self._count()
+        body = self._read_json()
+        if self.path.endswith("/embeddings"):
+            self._embeddings(body)
+        elif self.path.endswith("/chat/completions"):
+            self._track(1)
+            try:
+                self._chat(body, n)
+            finally:
+                self._track(-1)
+        else:
+            self._send(404, b'{"error": {"message": "not found"}}', "application/json")
+
+    def _embeddings(self, body):
+        settings = self.server.settings
+        inputs = body.get("input") or []
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        time.sleep(settings.get("embedding_latency", 0.02))
+        data = []
+        for i, text in enumerate(inputs):
+            digest = hashlib.sha256(str(text).encode("utf-8")).digest()
+            data.append({"object": "embedding", "index": i, "embedding": [b / 255 - 0.5 for b in digest]})
+        payload = {"object": "list", "data": data, "model": body.get("model"), "usage": {"prompt_tokens": 0, "total_tokens": 0}}
+        self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+
+    def _chat(self, body, n):
+        settings = self.server.settings
+        answer = " ".join(f"{s.rstrip('.')} ({n})." for s in MOCK_ANSWER.split(". "))
+        tokens = [w + " " for w in answer.split(" ")]
+        time.sleep(settings.get("first_token_latency", 0.3))
+        base = {"id": f"mock-{n}", "created": int(time.time()), "model": body.get("model")}
+        if not body.get("stream"):
+            time.sleep(settings.get("token_latency", 0.01) * len(tokens))
+            payload = dict(base, object="chat.completion", choices=[{
+                "index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": answer},
+            }])
+            self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(settings.get("token_latency", 0.01))
+            chunk = dict(base, object="chat.completion.chunk", choices=[{
+                "index": 0, "finish_reason": None, "delta": {"content": token},
+            }])
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def mock_openai_server(first_token_latency=0.3, token_latency=0.01, embedding_latency=0.02):
+    """Use ``server.url + "/v1"`` as the OpenAI base_url."""
+    return MockServer(MockOpenAIHandler, first_token_latency=first_token_latency,
+                      token_latency=token_latency, embedding_latency=embedding_latency)
@@ -0,0 +1,54 @@
+"""Bytes of markdown/HTML the app emits per rerun of each page.
+
+Runs portfolio.py headless with Streamlit's AppTest and sums the element
+bodies that are sent to the browser on every rerun (inline data URIs
+included). ``--script`` points it at another checkout for a before/after
+comparison; each app runs from its own directory, so it loads its own
+modules and assets.
+
+    python -m benchmarks.page_payload
+    git worktree add /tmp/baseline <commit>
+    python -m benchmarks.page_payload --script /tmp/baseline/portfolio.py
+"""
+import argparse
+import json
+import os
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+
+def page_bytes(at):
+    total = sum(len(m.value.encode("utf-8")) for m in at.markdown)
+    total += sum(len(getattr(h, "body", "").encode("utf-8")) for h in at.get("html"))
+    return total
+
+
+def measure(script="portfolio.py"):
+    script = os.path.abspath(script)
+    os.chdir(os.path.dirname(script))
+    sys.path.insert(0, os.path.dirname(script))
+    at = AppTest.from_file(script, default_timeout=60)
+    at.secrets["EMBEDDING_BACKEND"] = "hashing"
+    at.run()
+    results = {"About": page_bytes(at)}
+    at.radio[0].set_value("Projects").run()
+    results["Projects"] = page_bytes(at)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default="portfolio.py")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else None  # measure() changes directory
+    results = measure(args.script)
+    print(json.dumps(results, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
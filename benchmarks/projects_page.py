@@ -0,0 +1,138 @@
+"""Projects page rerun time as the number of projects grows.
+
+Copies the app into a temporary directory, replaces assets/projects.json
+with N generated projects, and times reruns of the Projects page with
+AppTest: the plain first page, a keyword search, a tool filter, and
+paging forward. Each N runs in a fresh interpreter so the caches start
+cold. Render time and page bytes should stay flat as N grows, since only
+one page of cards is sent per rerun.
+
+    python -m benchmarks.projects_page --sizes 10 100 1000 5000 --output projects_page.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS = ["Python", "SQL", "Power BI", "Excel", "Tableau", "Pandas", "Streamlit", "OpenAI",
+         "DAX", "R", "Spark", "dbt", "Airflow", "Looker", "Snowflake", "scikit-learn"]
+WORDS = ("shipping emissions dashboard sales forecast retail market churn survey freight port "
+         "chartering climate energy inventory pricing customer marketing analysis model report "
+         "pipeline warehouse cohort revenue logistics supply demand weather tanker").split()
+
+_CHILD = r"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+reruns = int(sys.argv[2])
+
+def timed(at, action):
+    times = []
+    for _ in range(reruns):
+        t = time.perf_counter()
+        action(at)
+        times.append(time.perf_counter() - t)
+    return times
+
+def page_bytes(at):
+    return sum(len(m.value) for m in at.markdown)
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.secrets["EMBEDDING_BACKEND"] = "hashing"
+at.run()
+t = time.perf_counter()
+at.radio[0].set_value("Projects").run()
+first = time.perf_counter() - t
+results = {"first_render": first, "scenarios": {}}
+scenarios = [
+    ("browse", lambda at: at.run()),
+    ("search", lambda at: at.text_input(key="project_query").set_value("shipping forecast").run()),
+    ("tool_filter", lambda at: at.multiselect(key="project_tools").set_value(["Python", "SQL"]).run()),
+]
+for name, action in scenarios:
+    times = timed(at, action)
+    results["scenarios"][name] = {"rerun": times, "bytes": page_bytes(at), "caption": at.caption[0].value}
+at.text_input(key="project_query").set_value("").run()
+at.multiselect(key="project_tools").set_value([]).run()
+times = []
+for _ in range(reruns):
+    buttons = [b for b in at.button if b.key == "project_next"]
+    if not buttons or buttons[0].disabled:
+        break
+    t = time.perf_counter()
+    buttons[0].click().run()
+    times.append(time.perf_counter() - t)
+results["scenarios"]["next_page"] = {"rerun": times, "bytes": page_bytes(at), "caption": at.caption[0].value}
+results["exceptions"] = [str(e.value) for e in at.exception]
+print(json.dumps(results))
+"""
+
+
+def generate_projects(n, seed=0):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        title = " ".join(rng.sample(WORDS, 3)).title()
+        projects.append({
+            "title": f"{title} {i}",
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160))),
+            "tools": rng.sample(TOOLS, rng.randint(1, 5)),
+            "link": f"https://example.com/projects/{i}",
+        })
+    return projects
+
+
+def prepare_app(directory, projects):
+    """Copy the app's modules and assets into ``directory`` with the given projects."""
+    for name in os.listdir(ROOT):
+        if name.endswith(".py"):
+            shutil.copy(os.path.join(ROOT, name), directory)
+    shutil.copytree(os.path.join(ROOT, "assets"), os.path.join(directory, "assets"))
+    with open(os.path.join(directory, "assets", "projects.json"), "w", encoding="utf-8") as f:
+        json.dump(projects, f)
+
+
+def measure(n, reruns):
+    with tempfile.TemporaryDirectory() as directory:
+        prepare_app(directory, generate_projects(n))
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD, "portfolio.py", str(reruns)],
+            cwd=directory, capture_output=True, text=True, check=True,
+        ).stdout
+    sample = json.loads(out.strip().splitlines()[-1])
+    return {
+        "projects": n,
+        "first_render": sample["first_render"],
+        "scenarios": {
+            name: {
+                "rerun_median": statistics.median(s["rerun"]) if s["rerun"] else None,
+                "page_bytes": s["bytes"],
+                "caption": s["caption"],
+            }
+            for name, s in sample["scenarios"].items()
+        },
+        "exceptions": sample["exceptions"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--reruns", type=int, default=5, help="reruns timed per scenario")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"settings": vars(args), "levels": [measure(n, args.reruns) for n in args.sizes]}
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Cold start and per-rerun script time of portfolio.py.
+
+Each cold start runs in a fresh interpreter: it times importing Streamlit's
+test harness plus the first full run of the script, and records which
+provider SDKs ended up imported. Reruns are then timed in that process
+for each page, the way a visitor's clicks re-execute the script.
+
+    python -m benchmarks.startup --runs 3 --reruns 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROVIDER_MODULES = ("openai", "requests", "numpy", "tiktoken")
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=60)
+at.secrets["EMBEDDING_BACKEND"] = "hashing"
+at.run()
+cold = time.perf_counter() - start
+imported = [m for m in json.loads(sys.argv[3]) if m in sys.modules]
+reruns = {}
+for page in ("About", "Projects"):
+    at.radio[0].set_value(page).run()
+    times = []
+    for _ in range(int(sys.argv[2])):
+        t = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t)
+    reruns[page] = times
+print(json.dumps({"cold_start": cold, "imported": imported, "reruns": reruns,
+                  "exceptions": [str(e.value) for e in at.exception]}))
+"""
+
+
+def measure(script, reruns):
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD, script, str(reruns), json.dumps(PROVIDER_MODULES)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to average the cold start over")
+    parser.add_argument("--reruns", type=int, default=10, help="reruns timed per page")
+    parser.add_argument("--script", default="portfolio.py")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = [measure(args.script, args.reruns) for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "cold_start": statistics.median(s["cold_start"] for s in samples),
+        "rerun_median": {
+            page: statistics.median(t for s in samples for t in s["reruns"][page])
+            for page in ("About", "Projects")
+        },
+        "provider_modules_imported_at_start": samples[0]["imported"],
+        "exceptions": samples[0]["exceptions"],
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
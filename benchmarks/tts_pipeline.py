@@ -0,0 +1,82 @@
+"""Time-to-first-audio: one blocking TTS call vs the sentence pipeline.
+
+Simulates a streamed LLM answer and synthesizes it against a local mock
+TTS server, first the old way (wait for the whole answer, one request)
+and then through TtsPipeline.
+
+    python -m benchmarks.tts_pipeline --runs 5
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from benchmarks.mock_servers import mock_tts_server
+from speech import TtsPipeline, elevenlabs_tts
+
+ANSWER = (
+    "The Maven Market dashboard was my first project, completed as a bonus after finishing my Power BI class. "
+    "While it challenged me as a beginner, those challenges strengthened my skills. "
+    "I cleaned the data with Power Query and built DAX measures for the key metrics. "
+    "Ultimately it encouraged me to dive deeper into data analytics and build more dashboards."
+)
+
+
+def fake_token_stream(text, token_delay):
+    for word in text.split(" "):
+        time.sleep(token_delay)
+        yield word + " "
+
+
+def run_sequential(synthesize, token_delay):
+    start = time.perf_counter()
+    answer = "".join(fake_token_stream(ANSWER, token_delay))
+    synthesize(answer)
+    return time.perf_counter() - start
+
+
+def run_pipelined(synthesize, token_delay):
+    pipeline = TtsPipeline(synthesize)
+    for token in fake_token_stream(ANSWER, token_delay):
+        pipeline.feed(token)
+        pipeline.ready()
+    first = next(pipeline.segments())
+    assert first
+    for _ in pipeline.segments():
+        pass
+    return pipeline.metrics["time_to_first_audio"], pipeline.metrics["total"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between LLM tokens")
+    parser.add_argument("--tts-latency", type=float, default=0.15, help="base mock TTS latency (s)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    with mock_tts_server(base_latency=args.tts_latency) as server:
+        session = requests.Session()
+
+        def synthesize(text):
+            return elevenlabs_tts(text, "test-key", "voice", base_url=server.url, session=session)
+
+        sequential = [run_sequential(synthesize, args.token_delay) for _ in range(args.runs)]
+        pipelined = [run_pipelined(synthesize, args.token_delay) for _ in range(args.runs)]
+
+    results = {
+        "runs": args.runs,
+        "sequential_time_to_first_audio": statistics.median(sequential),
+        "pipelined_time_to_first_audio": statistics.median(p[0] for p in pipelined),
+        "pipelined_total": statistics.median(p[1] for p in pipelined),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
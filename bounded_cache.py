@@ -0,0 +1,106 @@
+"""Bounded, process-wide LRU caches for per-portfolio state.
+
+Knowledge bases, encoded assets, rendered fragments and search indexes
+are built per portfolio (tenant) on first use and kept in these caches.
+Each cache holds at most ``max_entries`` items and, optionally,
+``max_bytes`` of values; the least recently used items are evicted, so
+memory follows the portfolios that are actually being visited. Every
+cache registers itself by name so limits can be set in one place and
+the operator panel can show all of them.
+"""
+import threading
+from collections import OrderedDict
+
+MAX_PORTFOLIOS = 32
+
+_registry = {}
+_portfolios = MAX_PORTFOLIOS  # set by configure_caches; caches registered later use it too
+
+
+class BoundedCache:
+    """LRU of at most ``per_portfolio`` entries for each portfolio kept warm."""
+
+    def __init__(self, name, per_portfolio=1, max_bytes=None, sizeof=None):
+        self.name = name
+        self.per_portfolio = per_portfolio
+        self.max_entries = per_portfolio * _portfolios
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._items = OrderedDict()  # key -> (value, size), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self.stats["hits"] += 1
+            return item[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (value, size)
+            self._bytes += size
+            self._evict()
+
+    def get_or_build(self, key, build):
+        """Cached value for key; a miss calls build() outside the lock and stores the result."""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def values(self):
+        with self._lock:
+            return [value for value, _ in self._items.values()]
+
+    def resize(self, max_entries=None, max_bytes=None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self):
+        # The newest entry always stays, even if it alone is over max_bytes
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, size) = self._items.popitem(last=False)
+            self._bytes -= size
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            info = dict(self.stats)
+            info["entries"] = len(self._items)
+            info["max_entries"] = self.max_entries
+            if self.max_bytes is not None:
+                info["bytes"] = self._bytes
+                info["max_bytes"] = self.max_bytes
+        return info
+
+
+def configure_caches(portfolios):
+    """Size every cache, including ones created later, for this many portfolios kept warm at once."""
+    global _portfolios
+    _portfolios = portfolios
+    for cache in list(_registry.values()):
+        cache.resize(max_entries=portfolios * cache.per_portfolio)
+
+
+def cache_stats():
+    return {name: cache.snapshot() for name, cache in sorted(_registry.items())}
@@ -0,0 +1,23 @@
+"""Settings for command-line tools that run outside Streamlit.
+
+The app itself reads ``st.secrets``; CLIs read the same
+``.streamlit/secrets.toml`` and let environment variables override it.
+"""
+import os
+import tomllib
+
+SECRETS_FILE = ".streamlit/secrets.toml"
+
+
+def load_secrets(path=SECRETS_FILE):
+    secrets = {}
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            secrets.update(tomllib.load(f))
+    for key in list(secrets) + [
+        "OPENAI_API_KEY", "OPENAI_MODEL", "OPENAI_BASE_URL", "ELEVEN_API_KEY", "ELEVEN_VOICE_ID", "ELEVEN_BASE_URL",
+        "TTS_CACHE_DIR", "TTS_CACHE_MAX_MB", "EMBEDDING_BACKEND", "FAQ_ARTIFACT_DIR", "TENANTS_DIR",
+    ]:
+        if os.environ.get(key):
+            secrets[key] = os.environ[key]
+    return secrets
@@ -0,0 +1,125 @@
+"""Fast local matching of visitor questions against assets/faq.json.
+
+Questions that are (near) copies of an FAQ entry are answered straight
+from its ``answer`` field without calling the model. Besides scoring high,
+a match must use the same content words as the entry (up to spelling),
+so swapping a single word ("AI" for "Python", "not") is not a match.
+"""
+import difflib
+import re
+import threading
+from dataclasses import dataclass
+
+from bounded_cache import BoundedCache
+from knowledge import load_knowledge
+
+MATCH_THRESHOLD = 0.85
+
+SPELLING_SIMILARITY = 0.8  # a content word this close to another counts as the same word
+
+_PUNCT_RE = re.compile(r"[^a-z0-9\s]")
+# Function words that rephrasings drop or swap freely; negations are content
+STOPWORDS = frozenset("""
+a an the is are was were be been being am do does did done have has had having
+i me my mine you your yours youre youve we our us it its this that these those there
+in on at of for to with about from by as into over so and or but if then than
+can could would should will shall may might must
+what whats which who whom how why when where tell please some any ever just really also
+""".split())
+
+
+def normalize(text):
+    """Lowercase, drop punctuation/apostrophes and collapse whitespace."""
+    text = _PUNCT_RE.sub("", text.lower().replace("'", "").replace("’", ""))
+    return " ".join(text.split())
+
+
+@dataclass(frozen=True)
+class FaqMatch:
+    question: str
+    answer: str
+    score: float
+
+
+class FaqMatcher:
+    """Normalized exact lookup plus a token/character similarity fallback."""
+
+    def __init__(self, faq, threshold=MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.entries = []
+        self.content = []
+        self.exact = {}
+        self.by_token = {}
+        for item in faq:
+            question, answer = item.get("question", ""), item.get("answer", "")
+            norm = normalize(question)
+            if not norm or not answer:
+                continue
+            idx = len(self.entries)
+            self.entries.append((question, answer, norm, frozenset(norm.split())))
+            self.content.append(_content(norm))
+            self.exact.setdefault(norm, idx)
+            for token in norm.split():
+                self.by_token.setdefault(token, []).append(idx)
+
+    def match(self, text, threshold=None):
+        """Return the best FaqMatch at or above the threshold, else None."""
+        threshold = self.threshold if threshold is None else threshold
+        norm = normalize(text)
+        if not norm:
+            return None
+        idx = self.exact.get(norm)
+        if idx is not None:
+            question, answer, _, _ = self.entries[idx]
+            return FaqMatch(question, answer, 1.0)
+        tokens = frozenset(norm.split())
+        content = _content(norm)
+        candidates = {i for t in tokens for i in self.by_token.get(t, ())}
+        best, best_score = None, 0.0
+        for i in candidates:
+            _, _, cand_norm, cand_tokens = self.entries[i]
+            if not _same_content(content, self.content[i]):
+                continue
+            # Dice coefficient over tokens, then character similarity
+            score = 2 * len(tokens & cand_tokens) / (len(tokens) + len(cand_tokens))
+            if score < threshold:
+                matcher = difflib.SequenceMatcher(None, norm, cand_norm)
+                if matcher.quick_ratio() >= threshold:
+                    score = max(score, matcher.ratio())
+            if score > best_score:
+                best, best_score = i, score
+        if best is None or best_score < threshold:
+            return None
+        question, answer, _, _ = self.entries[best]
+        return FaqMatch(question, answer, round(best_score, 3))
+
+
+def _content(norm):
+    return frozenset(t for t in norm.split() if t not in STOPWORDS)
+
+
+def _covered(words, others):
+    """Every word in ``words`` is in ``others`` or a close spelling of one."""
+    for word in words - others:
+        if not any(difflib.SequenceMatcher(None, word, other).ratio() >= SPELLING_SIMILARITY for other in others):
+            return False
+    return True
+
+
+def _same_content(a, b):
+    return _covered(a, b) and _covered(b, a)
+
+
+_matchers = BoundedCache("faq_matchers")
+_matcher_lock = threading.Lock()
+
+
+def get_faq_matcher(threshold=MATCH_THRESHOLD, snapshot=None):
+    """Return the matcher for this knowledge version, building it once."""
+    snapshot = snapshot or load_knowledge()
+    key = (snapshot.version, threshold)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        with _matcher_lock:
+            matcher = _matchers.get_or_build(key, lambda: FaqMatcher(snapshot.faq, threshold))
+    return matcher
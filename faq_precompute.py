@@ -0,0 +1,230 @@
+"""Pre-computed FAQ answers, paraphrases and audio.
+
+A batch build asks the model once per FAQ entry for a polished answer and
+a few paraphrases of the question, synthesizes the answer's audio, and
+writes everything to a versioned artifact in ``.cache/faq``. Each entry is
+keyed by a hash of its source question and answer plus the build
+settings, so a rebuild only regenerates entries that changed. At runtime,
+questions matching an entry (or one of its paraphrases) are answered from
+the artifact instantly, audio included.
+
+    python faq_precompute.py [--tenant ID] [--paraphrases 3] [--no-llm] [--no-audio]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+
+from bounded_cache import BoundedCache
+from faq_match import FaqMatcher, MATCH_THRESHOLD
+from shared import file_stamp
+
+FAQ_ARTIFACT_DIR = ".cache/faq"
+ARTIFACT_FILE = "artifact.json"
+FORMAT = 1
+PARAPHRASES = 3
+LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+POLISH_PROMPT_TEMPLATE = (
+    "You are {name}'s AI assistant. Rewrite the FAQ answer below as a warm, natural spoken reply "
+    "to the question, in first person as {name}. Keep every fact, add nothing new, and stay under 90 words."
+)
+PERSONA = "Claire"  # first name of the built-in portfolio
+PARAPHRASE_PROMPT = (
+    "Write {n} different ways a website visitor might ask the question below. "
+    "Reply with a JSON array of strings only."
+)
+
+
+def _sha(*parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def entry_key(item):
+    """Identity of an FAQ entry: its source question and answer."""
+    return _sha(item.get("question", ""), item.get("answer", ""))
+
+
+def build_signature(model, paraphrases, use_llm, voice_id, persona=PERSONA):
+    """Settings that, when changed, invalidate every entry."""
+    polish_prompt = POLISH_PROMPT_TEMPLATE.format(name=persona)
+    return _sha(str(FORMAT), polish_prompt, PARAPHRASE_PROMPT, model or "", str(paraphrases), str(use_llm), voice_id or "")
+
+
+def _parse_list(text):
+    try:
+        items = json.loads(text)
+    except ValueError:
+        # One question per line; only a leading bullet or "1." marker is dropped
+        items = [LIST_MARKER.sub("", line).strip().strip("\"'") for line in text.splitlines()]
+    return [str(i).strip() for i in items if isinstance(i, str) and str(i).strip()] if isinstance(items, list) else []
+
+
+def load_artifact(directory=FAQ_ARTIFACT_DIR):
+    try:
+        with open(os.path.join(directory, ARTIFACT_FILE), encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return artifact if artifact.get("format") == FORMAT else None
+
+
+def build_artifact(faq, directory=FAQ_ARTIFACT_DIR, complete=None, synthesize=None, model=None,
+                   voice_id=None, paraphrases=PARAPHRASES, log=print, persona=PERSONA):
+    """Build or update the artifact; returns a report of reused/built/removed entries.
+
+    ``complete(system_prompt, messages)`` returns model text (None skips
+    polishing and paraphrases); ``synthesize(text)`` returns MP3 bytes
+    (None skips audio). Answers are polished in ``persona``'s voice.
+    """
+    use_llm = complete is not None
+    signature = build_signature(model, paraphrases, use_llm, voice_id if synthesize else None, persona)
+    polish_prompt = POLISH_PROMPT_TEMPLATE.format(name=persona)
+    previous = load_artifact(directory) or {}
+    old_entries = previous.get("entries", {}) if previous.get("signature") == signature else {}
+    audio_dir = os.path.join(directory, "audio")
+    os.makedirs(audio_dir, exist_ok=True)
+    entries, report = {}, {"reused": 0, "built": 0, "removed": 0}
+    for item in faq:
+        question, answer = item.get("question", ""), item.get("answer", "")
+        if not question or not answer:
+            continue
+        key = entry_key(item)
+        old = old_entries.get(key)
+        if old and (not old.get("audio") or os.path.exists(os.path.join(audio_dir, old["audio"]))):
+            entries[key] = old
+            report["reused"] += 1
+            continue
+        log(f"building: {question}")
+        entry = {"question": question, "answer": answer, "paraphrases": []}
+        if use_llm:
+            entry["answer"] = complete(polish_prompt, [
+                {"role": "user", "content": f"Question: {question}\nFAQ answer: {answer}"},
+            ]).strip()
+            if paraphrases:
+                text = complete(PARAPHRASE_PROMPT.format(n=paraphrases), [{"role": "user", "content": question}])
+                entry["paraphrases"] = _parse_list(text)[:paraphrases]
+        if synthesize is not None:
+            audio = synthesize(entry["answer"])
+            entry["audio"] = f"{key}.mp3"
+            with open(os.path.join(audio_dir, entry["audio"]), "wb") as f:
+                f.write(audio)
+        entries[key] = entry
+        report["built"] += 1
+    report["removed"] = len(set(previous.get("entries", {})) - set(entries))
+    # Audio for entries that are gone is deleted with them
+    keep = {e.get("audio") for e in entries.values()}
+    for name in os.listdir(audio_dir):
+        if name not in keep:
+            os.remove(os.path.join(audio_dir, name))
+    artifact = {
+        "format": FORMAT,
+        "signature": signature,
+        "voice": voice_id if synthesize else None,
+        "version": _sha(signature, *sorted(entries)),
+        "entries": entries,
+    }
+    path = os.path.join(directory, ARTIFACT_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    report["version"] = artifact["version"]
+    return report
+
+
+class PrecomputedFaq:
+    """Serves artifact entries whose source still matches the current faq.json."""
+
+    def __init__(self, artifact, faq, directory=FAQ_ARTIFACT_DIR, threshold=MATCH_THRESHOLD):
+        self.directory = directory
+        self.version = artifact.get("version")
+        self.voice = artifact.get("voice")
+        current = {entry_key(item) for item in faq}
+        # Stale entries (source edited since the build) fall back to the live path
+        self.entries = {k: e for k, e in artifact.get("entries", {}).items() if k in current}
+        self.matcher = FaqMatcher([
+            {"question": q, "answer": key}
+            for key, e in self.entries.items()
+            for q in [e["question"]] + e.get("paraphrases", [])
+        ], threshold)
+
+    def match(self, text):
+        """Return (entry, score) for a matching question, else None."""
+        hit = self.matcher.match(text)
+        if hit is None:
+            return None
+        return self.entries[hit.answer], hit.score
+
+    def audio(self, entry, voice_id):
+        """The entry's MP3 if it was synthesized in ``voice_id``, else None (speak it live)."""
+        if not entry.get("audio") or voice_id != self.voice:
+            return None
+        try:
+            with open(os.path.join(self.directory, "audio", entry["audio"]), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+_precomputed = BoundedCache("precomputed_faq")
+_precomputed_lock = threading.Lock()
+
+
+def get_precomputed_faq(snapshot, directory=FAQ_ARTIFACT_DIR, threshold=MATCH_THRESHOLD):
+    """The artifact for this knowledge version, reloaded when the file changes; None if absent."""
+    stamp = file_stamp(os.path.join(directory, ARTIFACT_FILE))
+    if stamp is None:
+        return None
+    key = (directory, snapshot.version, stamp, threshold)
+    cached = _precomputed.get(directory)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _precomputed_lock:
+        artifact = load_artifact(directory)
+        precomputed = PrecomputedFaq(artifact, snapshot.faq, directory, threshold) if artifact else None
+        _precomputed.set(directory, (key, precomputed))
+    return precomputed
+
+
+def main():
+    from assistant import AssistantService, AssistantSettings
+    from config import load_secrets
+    from tenants import BUILTIN_TENANT, TENANTS_DIR, get_tenant
+
+    parser = argparse.ArgumentParser(description="Pre-compute FAQ answers, paraphrases and audio.")
+    parser.add_argument("--tenant", default=BUILTIN_TENANT, help="portfolio to build (a directory under tenants/)")
+    parser.add_argument("--out", default=None, help=f"artifact directory (default {FAQ_ARTIFACT_DIR}, per portfolio)")
+    parser.add_argument("--paraphrases", type=int, default=PARAPHRASES)
+    parser.add_argument("--no-llm", action="store_true", help="keep answers as written, no paraphrases")
+    parser.add_argument("--no-audio", action="store_true")
+    args = parser.parse_args()
+
+    secrets = load_secrets()
+    tenant = get_tenant(args.tenant, secrets.get("TENANTS_DIR", TENANTS_DIR))
+    if tenant is None:
+        parser.error(f"unknown portfolio: {args.tenant}")
+    settings = AssistantSettings.from_secrets(secrets)
+    directory = args.out or tenant.faq_artifact_dir(settings.faq_artifact_dir)
+    use_llm = not args.no_llm
+    if use_llm and not settings.openai_api_key:
+        parser.error("OPENAI_API_KEY must be set (env or .streamlit/secrets.toml), or pass --no-llm")
+    with_audio = not args.no_audio and settings.tts_enabled
+    voice_id = tenant.voice_id or settings.eleven_voice_id
+    if not args.no_audio and not with_audio:
+        print("ELEVEN_API_KEY/ELEVEN_VOICE_ID not set; building without audio")
+    service = AssistantService(settings)
+    report = build_artifact(
+        tenant.knowledge().faq, directory,
+        complete=service.complete if use_llm else None,
+        synthesize=(lambda text: service.synthesize(text, voice_id=voice_id)) if with_audio else None,
+        model=settings.openai_model, voice_id=voice_id,
+        paraphrases=args.paraphrases if use_llm else 0,
+        persona=tenant.first_name,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
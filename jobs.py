@@ -0,0 +1,130 @@
+"""Background jobs for provider calls, tracked per Streamlit session.
+
+Chat, TTS and transcription work is submitted to a process-wide worker
+pool instead of running inside the session's script thread. The UI polls
+jobs for partial output and results, and can cancel a session's jobs when
+the visitor navigates away. Job bodies receive the Job and should check
+``job.cancelled`` between steps; they must not call Streamlit.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from shared import process_wide
+
+MAX_WORKERS = 8
+KEEP_FINISHED_SECONDS = 600
+
+
+class Job:
+    """One unit of background work plus its streamed output."""
+
+    def __init__(self, session_id, kind, meta=None):
+        self.id = uuid.uuid4().hex
+        self.session_id = session_id
+        self.kind = kind
+        self.meta = dict(meta or {})
+        self.partial = []   # text tokens, appended as they arrive
+        self.segments = []  # audio segments, appended in playback order
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.status = "cancelled"
+            self.finished = time.time()
+
+
+class JobManager:
+    """Runs jobs on a bounded pool and indexes them by id and session."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0}
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id, kind, fn, *args, meta=None):
+        """Run fn(job, *args) in the background and return the Job."""
+        job = Job(session_id, kind, meta)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            self.stats["submitted"] += 1
+        job.future = self.executor.submit(self._run, job, fn, args)
+        return job
+
+    def _run(self, job, fn, args):
+        if job.cancelled:
+            self._finish(job, "cancelled")
+            return
+        job.status = "running"
+        try:
+            job.result = fn(job, *args)
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, "failed")
+            return
+        self._finish(job, "cancelled" if job.cancelled else "done")
+
+    def _finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        with self._lock:
+            self.stats[status] += 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def cancel(self, job):
+        """Cancel one job; a running job is counted when it stops, a queued one here."""
+        job.cancel()
+        if job.status == "cancelled":
+            with self._lock:
+                self.stats["cancelled"] += 1
+
+    def cancel_session(self, session_id):
+        """Cancel every unfinished job of a session; returns how many were cancelled."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j.session_id == session_id and not j.done]
+        for job in jobs:
+            self.cancel(job)
+        return len(jobs)
+
+    def _prune(self):
+        cutoff = time.time() - KEEP_FINISHED_SECONDS
+        for job_id in [i for i, j in self._jobs.items() if j.finished and j.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def snapshot(self):
+        with self._lock:
+            info = dict(self.stats)
+            info["queued"] = sum(1 for j in self._jobs.values() if j.status == "queued")
+            info["running"] = sum(1 for j in self._jobs.values() if j.status == "running")
+            info["sessions"] = len({j.session_id for j in self._jobs.values() if not j.done})
+        return info
+
+
+def get_job_manager(max_workers=MAX_WORKERS):
+    """Return the process-wide JobManager, creating it on first use."""
+    return process_wide("job_manager", JobManager, max_workers)
@@ -0,0 +1,99 @@
+"""Process-wide knowledge base for the portfolio assistant.
+
+The CV text, projects and FAQ are read once and shared by every Streamlit
+session. Each lookup only stats the files; they are re-read when a file's
+mtime/size changes and re-parsed only when the content hash differs.
+Every portfolio (see tenants.py) has its own knowledge base, kept in a
+bounded cache so only recently visited portfolios stay in memory.
+"""
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+
+from bounded_cache import BoundedCache
+from shared import file_stamp
+
+CV_TEXT_FILE = "assets/@claire.cv.txt"
+PROJECTS_FILE = "assets/projects.json"
+FAQ_FILE = "assets/faq.json"
+
+
+@dataclass(frozen=True)
+class KnowledgeSnapshot:
+    """Immutable view of the assets at one version."""
+    version: str
+    cv_text: str = ""
+    projects: list = field(default_factory=list)
+    faq: list = field(default_factory=list)
+
+
+def _read_bytes(path):
+    if not os.path.exists(path):
+        return b""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _load_json(raw):
+    if not raw:
+        return []
+    return json.loads(raw.decode("utf-8"))
+
+
+class KnowledgeBase:
+    """Loads the assistant assets once and reloads them when they change."""
+
+    def __init__(self, cv_path=CV_TEXT_FILE, projects_path=PROJECTS_FILE, faq_path=FAQ_FILE):
+        self.paths = (cv_path, projects_path, faq_path)
+        self.stats = {"hits": 0, "misses": 0, "reloads": 0}
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._snapshot = None
+
+    def get(self):
+        """Return the current snapshot, reloading the assets if they changed."""
+        stamp = tuple(file_stamp(path) for path in self.paths)
+        with self._lock:
+            if self._snapshot is not None and stamp == self._stamp:
+                self.stats["hits"] += 1
+                return self._snapshot
+            self.stats["misses"] += 1
+            raw = [_read_bytes(path) for path in self.paths]
+            digest = hashlib.sha256(b"\0".join(raw)).hexdigest()[:16]
+            if self._snapshot is None or digest != self._snapshot.version:
+                self._snapshot = self._build(digest, *raw)
+                self.stats["reloads"] += 1
+            self._stamp = stamp
+            return self._snapshot
+
+    @staticmethod
+    def _build(version, cv_raw, projects_raw, faq_raw):
+        cv_text = cv_raw.decode("utf-8", errors="ignore")
+        projects = _load_json(projects_raw)
+        faq = _load_json(faq_raw)
+        return KnowledgeSnapshot(version=version, cv_text=cv_text, projects=projects, faq=faq)
+
+
+_knowledge_bases = BoundedCache("knowledge_bases")
+
+
+def get_knowledge_base(paths=None):
+    """Return the process-wide KnowledgeBase for these asset paths (survives Streamlit reruns)."""
+    paths = tuple(paths or (CV_TEXT_FILE, PROJECTS_FILE, FAQ_FILE))
+    return _knowledge_bases.get_or_build(paths, lambda: KnowledgeBase(*paths))
+
+
+def load_knowledge(paths=None):
+    """Shortcut for the current snapshot of a shared knowledge base (the default assets if no paths)."""
+    return get_knowledge_base(paths).get()
+
+
+def knowledge_stats():
+    """Reload counters summed over the cached knowledge bases."""
+    totals = {"hits": 0, "misses": 0, "reloads": 0}
+    for kb in _knowledge_bases.values():
+        for key in totals:
+            totals[key] += kb.stats[key]
+    return totals
@@ -0,0 +1,202 @@
+"""Pre-rendered HTML for the static parts of the About and Projects pages.
+
+The certifications, skills and contact sections and the project cards do
+not change between requests, so they are rendered to HTML once and reused
+on every rerun. Project cards are keyed by the knowledge base version and
+rebuilt when the assets change; each portfolio's fragments are keyed by
+its own content. ``python pages.py`` writes the default portfolio's
+fragments to ``.cache/pages`` ahead of time; the app uses that build when
+its version matches and renders in memory otherwise.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+
+from bounded_cache import BoundedCache
+from knowledge import load_knowledge
+
+PAGES_CACHE_DIR = ".cache/pages"
+
+ABOUT_TEXT = """Hi,  I am Claire, a data analytics enthusiast and International Shipping and chartering student at Hochschule Bremen,
+             with practical experience in analyzing shipping data, environmental impacts, and
+             global trade trends. I specialize in transforming complex datasets into actionable
+             insights through SQL, Python, Power BI, and interactive dashboards, while integrating
+              AI for smarter analysis. Passionate about applying data to real-world shipping and
+              Business environments to drive informed decision-making and sustainability initiatives.
+    """
+CERTIFICATIONS = [
+    ("Supply Chain Management and Analytics", "Coursera"),
+    ("Introduction to Data Analytics", "Coursera"),
+    ("SQL & Databases", "Udemy"),
+    ("Power BI", "Udemy"),
+]
+INTERESTS = ["Data Analysis", "Logistics and Supply Chain", "Maritime Analytics", "Chartering Practises"]
+SKILLS = ["🐍 Python", "🗄️ SQL", "📊 Power BI", "⚡ Streamlit", "📂 Git/GitHub", "💼 MS Office"]
+CONTACTS = [
+    ("LinkedIn", "LinkedIn", "https://www.linkedin.com/in/namusoke-claire-129711335"),
+    ("GitHub", "claire-namusoke", "https://github.com/claire-namusoke"),
+    ("Email", "clairenamusoke1@gmail.com", None),
+]
+
+# Other portfolios supply the same keys in their tenant.json (see tenants.py)
+DEFAULT_PROFILE = {
+    "about": ABOUT_TEXT,
+    "certifications": CERTIFICATIONS,
+    "interests": INTERESTS,
+    "skills": SKILLS,
+    "contacts": CONTACTS,
+}
+
+SKILLS_STYLE = """<style>
+@keyframes pulse {
+    0%, 100% { transform: scale(1); }
+    50% { transform: scale(1.1); }
+}
+.skill-badge {
+    display: inline-block;
+    margin: 5px;
+    padding: 8px 15px;
+    background: linear-gradient(135deg, #1f5a8a 0%, #14406b 100%);
+    color: white;
+    border-radius: 20px;
+    font-weight: bold;
+    animation: pulse 2s ease-in-out infinite;
+}
+.skill-badge:nth-child(2) { animation-delay: 0.2s; }
+.skill-badge:nth-child(3) { animation-delay: 0.4s; }
+.skill-badge:nth-child(4) { animation-delay: 0.6s; }
+.skill-badge:nth-child(5) { animation-delay: 0.8s; }
+.skill-badge:nth-child(6) { animation-delay: 1s; }
+</style>"""
+_P = "<p style='margin-top: 0; margin-bottom: 16px;'>{}</p>"
+_H3 = "<h3 style='margin-top: 0; margin-bottom: 16px;'>{}</h3>"
+
+
+def _render_about(profile=None):
+    """About sections; a portfolio's own profile only shows the sections it supplies."""
+    e = html.escape
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    certifications = profile.get("certifications") or []
+    certs = "".join(_P.format(e(name)) for name, _ in certifications)
+    issuers = "".join(_P.format(e(issuer)) for _, issuer in certifications)
+    interests = "".join(_P.format(e(i)) for i in profile.get("interests") or [])
+    badges = "".join(f'<span class="skill-badge">{e(s)}</span>' for s in profile.get("skills") or [])
+    contacts = "".join(
+        f"<li><strong>{e(label)}:</strong> "
+        + (f"<a href='{e(url)}'>{e(text)}</a>" if url else e(text))
+        + "</li>"
+        for label, text, url in profile.get("contacts") or []
+    )
+    parts = []
+    if certs or interests:
+        parts.append("<div style='display: flex; gap: 30px; align-items: start;'>")
+        if certs:
+            parts.append(f"<div>{_H3.format('Certifications')}{certs}</div>")
+            parts.append(f"<div><h3 style='margin-top: 0; margin-bottom: 16px; opacity: 0;'>.</h3>{issuers}</div>")
+        if interests:
+            parts.append(f"<div style='margin-left: 300px;'>{_H3.format('Interests')}{interests}</div>")
+        parts.append("</div>")
+    if badges:
+        parts.append(f"<h3>Data Skills</h3>{SKILLS_STYLE}<div>{badges}</div>")
+    if contacts:
+        parts.append(f"<h3>Contact</h3><ul>{contacts}</ul>")
+    return "".join(parts)
+
+
+def render_project_card(project):
+    e = html.escape
+    title = e(str(project.get("title") or ""))
+    link = e(str(project.get("link") or "#"), quote=True)
+    card = f"<h3>🔗 <a href='{link}'>{title}</a></h3>"
+    if project.get("tools"):
+        tools = " • ".join(e(str(t)) for t in project["tools"])
+        card += f"<p style='color: #58a6ff;'><strong>Tools:</strong> {tools}</p>"
+    return card + "<hr>"
+
+
+def _render_projects(projects):
+    return [render_project_card(p) for p in projects]
+
+
+# Static content only changes with the code, so its version is its own hash
+ABOUT_VERSION = hashlib.sha256(_render_about().encode("utf-8")).hexdigest()[:16]
+
+_cache = BoundedCache("page_fragments", per_portfolio=2)
+stats = {"hits": 0, "builds": 0, "disk_loads": 0}
+
+
+def _load_built(name, version, cache_dir):
+    try:
+        with open(os.path.join(cache_dir, f"{name}.json"), encoding="utf-8") as f:
+            built = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return built["fragment"] if built.get("version") == version else None
+
+
+def _fragment(name, version, render, cache_dir=PAGES_CACHE_DIR):
+    fragment = _cache.get((name, version))
+    if fragment is not None:
+        stats["hits"] += 1
+        return fragment
+    fragment = _load_built(name, version, cache_dir)
+    if fragment is not None:
+        stats["disk_loads"] += 1
+    else:
+        fragment = render()
+        stats["builds"] += 1
+    _cache.set((name, version), fragment)
+    return fragment
+
+
+def about_text(profile=None):
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    return profile.get("about") or ""
+
+
+def about_html(profile=None):
+    """Certifications, interests, skills and contact sections as one HTML block."""
+    if profile is None:
+        return _fragment("about", ABOUT_VERSION, _render_about)
+    version = hashlib.sha256(json.dumps(profile, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return _fragment("about", version, lambda: _render_about(profile))
+
+
+def project_cards(snapshot=None):
+    """One HTML card per project, in projects.json order."""
+    snapshot = snapshot or load_knowledge()
+    return _fragment("projects", snapshot.version, lambda: _render_projects(snapshot.projects))
+
+
+def build(cache_dir=PAGES_CACHE_DIR):
+    """Write every fragment with its version; returns the written paths."""
+    os.makedirs(cache_dir, exist_ok=True)
+    snapshot = load_knowledge()
+    written = []
+    for name, version, fragment in [
+        ("about", ABOUT_VERSION, _render_about()),
+        ("projects", snapshot.version, _render_projects(snapshot.projects)),
+    ]:
+        path = os.path.join(cache_dir, f"{name}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "fragment": fragment}, f)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render the static page fragments.")
+    parser.add_argument("--cache-dir", default=PAGES_CACHE_DIR)
+    args = parser.parse_args()
+    for path in build(args.cache_dir):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
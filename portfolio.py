@@ -1,21 +1,75 @@
 # app.py
 import streamlit as st
 import os
-import requests
-import json
-import base64
-from openai import OpenAI
-
-# ---------- PAGE CONFIG ----------
-st.set_page_config(page_title="Claire Namusoke — Portfolio", layout="wide")
+import hashlib
+import time
+import uuid
+from assistant import RESPONSE_TYPES, SPEECH_ONLY, TEXT_ONLY, AssistantSettings, get_assistant
+from bounded_cache import cache_stats, configure_caches
+from pages import about_html, about_text, project_cards, stats as page_fragment_stats
+from project_index import get_project_index, paginate
+from audio_store import get_audio_store
+from jobs import get_job_manager
+from sessions import bound_history, deep_sizeof, get_session_registry
+from static_assets import image_data_uri, read_asset_bytes, set_max_bytes as set_static_assets_max_bytes
+from speech import estimate_mp3_duration
+from telemetry import metrics, record, serve_metrics, timed
+from tenants import BUILTIN_TENANT, resolve_tenant
 
 # ---------- CONFIG ----------
-OPENAI_API_KEY = st.secrets.get("OPENAI_API_KEY")
-OPENAI_MODEL = st.secrets.get("OPENAI_MODEL", "gpt-4o-mini")  
-ELEVEN_API_KEY = st.secrets.get("ELEVEN_API_KEY") 
-ELEVEN_VOICE_ID = st.secrets.get("ELEVEN_VOICE_ID")  
-CV_FILEPATH = "assets/@claire.cv.pdf"
-PROJECTS_FILE = "assets/projects.json"
+JOB_WORKERS = int(st.secrets.get("JOB_WORKERS", 8))  # background provider calls across all sessions
+JOB_POLL_SECONDS = 0.3
+SESSION_MAX_TURNS = int(st.secrets.get("SESSION_MAX_TURNS", 20))  # question/answer pairs kept per chat widget
+SESSION_MAX_KB = int(st.secrets.get("SESSION_MAX_KB", 64))  # text kept per chat widget
+SESSION_IDLE_MINUTES = float(st.secrets.get("SESSION_IDLE_MINUTES", 30))  # idle sessions lose history and jobs
+METRICS_PORT = st.secrets.get("METRICS_PORT")  # serve /metrics and /metrics.json on localhost
+METRICS_LOG = st.secrets.get("METRICS_LOG")  # append one JSON line per timed stage
+METRICS_FILE = st.secrets.get("METRICS_FILE")  # Prometheus textfile, rewritten after each rerun
+PROJECTS_PER_PAGE = int(st.secrets.get("PROJECTS_PER_PAGE", 10))  # project cards rendered per rerun
+TENANT = st.secrets.get("TENANT", BUILTIN_TENANT)  # portfolio shown when the URL has no ?tenant=
+TENANTS_DIR = st.secrets.get("TENANTS_DIR", "tenants")  # one sub-directory per hosted portfolio
+MAX_ACTIVE_TENANTS = int(st.secrets.get("MAX_ACTIVE_TENANTS", 32))  # portfolios kept warm in the shared caches
+STATIC_ASSETS_MAX_MB = int(st.secrets.get("STATIC_ASSETS_MAX_MB", 64))  # encoded CVs and pictures, all portfolios
+AVATAR_PX = 140  # avatars render at <= 70px; 2x for high-DPI screens
+
+@st.cache_resource(show_spinner=False)
+def app_settings():
+    """Model, TTS, cache and prompt settings, read from st.secrets once per process"""
+    return AssistantSettings.from_secrets(st.secrets)
+
+def get_service():
+    """The assistant shared by every session and both chat widgets.
+
+    Created on the first chat, speech or transcription request, so visitors
+    who only browse never load the provider SDKs.
+    """
+    return get_assistant(app_settings())
+
+@st.cache_resource(show_spinner=False)
+def process_setup():
+    """One-time process setup kept out of the per-rerun script body"""
+    metrics.log_path = METRICS_LOG
+    metrics.add_collector("jobs", get_job_manager(JOB_WORKERS).snapshot)
+    metrics.add_collector("audio_store", get_audio_store().snapshot)
+    registry = get_session_registry(SESSION_IDLE_MINUTES * 60, on_expire=get_job_manager(JOB_WORKERS).cancel_session)
+    metrics.add_collector("sessions", registry.snapshot)
+    configure_caches(MAX_ACTIVE_TENANTS)
+    set_static_assets_max_bytes(STATIC_ASSETS_MAX_MB * 1024 * 1024)
+    metrics.add_collector("portfolio_cache", lambda: {
+        f"{name}_{key}": value for name, info in cache_stats().items() for key, value in info.items()
+    })
+    if METRICS_PORT:
+        serve_metrics(int(METRICS_PORT))
+    return registry
+
+sessions = process_setup()
+
+# ---------- Portfolio ----------
+# Chosen per visit; its files are loaded on first use and shared through bounded caches
+tenant = resolve_tenant(st.query_params.get("tenant"), TENANT, TENANTS_DIR)
+
+# ---------- PAGE CONFIG ----------
+st.set_page_config(page_title=f"{tenant.name} — Portfolio", layout="wide")
 
 # ---------- STYLING ----------
 st.markdown("""
@@ -38,138 +92,170 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- Helpers ----------
-def load_projects():
-    if os.path.exists(PROJECTS_FILE):
-        with open(PROJECTS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
 def provide_cv_download():
-    if os.path.exists(CV_FILEPATH):
-        with open(CV_FILEPATH, "rb") as f:
-            b = f.read()
-            b64 = base64.b64encode(b).decode()
-            href = f'<a href="data:application/pdf;base64,{b64}" download="@claire.cv.pdf">Download CV (PDF)</a>'
-            st.markdown(href, unsafe_allow_html=True)
+    # Served through Streamlit's media endpoint; the PDF is only sent when clicked
+    cv_bytes = read_asset_bytes(tenant.cv_pdf)
+    if cv_bytes:
+        st.download_button("Download CV (PDF)", data=cv_bytes, file_name=os.path.basename(tenant.cv_pdf), mime="application/pdf", key="cv_download")
     else:
-        st.info("CV file not found in assets/@claire.cv.pdf")
+        st.info(f"CV file not found in {tenant.cv_pdf}")
 
 def add_chat_message(role, text):
     if "messages" not in st.session_state:
         st.session_state.messages = []
     st.session_state.messages.append({"role": role, "content": text})
 
-def openai_chat_completion(system_prompt, messages, model=OPENAI_MODEL):
-    try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[{"role":"system","content":system_prompt}] + messages,
-            temperature=0.2,
-            max_tokens=800
-        )
-        return resp.choices[0].message.content
-    except Exception as e:
-        return f"Error contacting OpenAI: {e}"
-
-def eleven_tts_generate(text):
-    if not ELEVEN_API_KEY or not ELEVEN_VOICE_ID:
-        return None
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVEN_VOICE_ID}"
-    headers = {"xi-api-key": ELEVEN_API_KEY, "Content-Type": "application/json"}
-    body = {
-        "text": text,
-        "model": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.7,
-            "similarity_boost": 0.8
-        }
-    }
-    try:
-        r = requests.post(url, json=body, headers=headers, timeout=30)
-        if r.status_code == 200:
-            # Check if response is valid audio
-            if r.content and len(r.content) > 1000:
-                return r.content
-            else:
-                st.error("TTS API returned success but no valid audio data.")
-                st.info(f"Debug: Response length={len(r.content)}; Content-Type={r.headers.get('Content-Type')}")
-                return None
+def remember(messages, msg):
+    """Append to a widget's history, dropping the oldest turns past the session limits"""
+    messages.append(msg)
+    dropped = bound_history(messages, SESSION_MAX_TURNS, SESSION_MAX_KB * 1024)
+    if dropped:
+        sessions.trimmed(dropped)
+
+def play_audio(audio_id):
+    st.session_state.playing_audio = audio_id
+
+def render_message_audio(msg, key):
+    """Autoplay a clip once; afterwards only fetch it from the store when asked to"""
+    store = get_audio_store()
+    if not msg.get("played"):
+        audio = store.get(msg["audio_id"])
+        if audio:
+            st.audio(audio, format="audio/mpeg", autoplay=True)
+        msg["played"] = True
+        return
+    st.button("🔊 Play", key=f"play_{key}", on_click=play_audio, args=(msg["audio_id"],))
+    # Kept mounted across reruns until another clip or question replaces it
+    if st.session_state.get("playing_audio") == msg["audio_id"]:
+        audio = store.get(msg["audio_id"])
+        if audio:
+            st.audio(audio, format="audio/mpeg", autoplay=True)
         else:
-            st.error(f"TTS Error: {r.status_code} {r.text}")
-            st.info(f"Debug: Response headers={r.headers}")
-            return None
-    except Exception as e:
-        st.error(f"TTS Exception: {e}")
-        return None
-
-def transcribe_audio(audio_bytes):
-    """Transcribe audio using OpenAI Whisper API"""
-    if not OPENAI_API_KEY:
-        return None
-    try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        # Save audio bytes to a temporary file
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_file_path = tmp_file.name
-        
-        # Transcribe using Whisper
-        with open(tmp_file_path, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file
-            )
-        
-        # Clean up temp file
-        os.unlink(tmp_file_path)
-        return transcript.text
-    except Exception as e:
-        st.error(f"Transcription error: {e}")
-        return None
+            st.caption("This audio clip has expired.")
+
+def get_session_id():
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def touch_session():
+    """Report activity to the idle-session registry (chat widget reruns skip the end of the script)"""
+    sessions.touch(
+        get_session_id(), deep_sizeof(st.session_state.to_dict()),
+        [st.session_state[key] for key in ("chat_messages", "ai_messages") if key in st.session_state],
+    )
+
+def chat_history(messages):
+    """Text turns of a widget's conversation, for the prompt builder"""
+    return [{"role": m["role"], "content": m["content"]} for m in messages if m.get("content")]
+
+BUSY_NOTICE = "Please wait for the current answer before asking another question."
+
+def chat_job_pending(job_key):
+    """True while the widget's previous answer is still running or not yet saved to its history"""
+    job_id = st.session_state.get(job_key)
+    return bool(job_id) and get_job_manager(JOB_WORKERS).get(job_id) is not None
+
+def submit_chat_job(job_key, question, response_type, system_prompt, history, audio=None):
+    """Start a chat job for this session and remember it under job_key (callers check chat_job_pending first)"""
+    previous = get_job_manager(JOB_WORKERS).get(st.session_state.get(job_key)) if st.session_state.get(job_key) else None
+    if previous is not None and not previous.done:
+        get_job_manager(JOB_WORKERS).cancel(previous)
+    job = get_job_manager(JOB_WORKERS).submit(
+        get_session_id(), "chat", get_service().run_job, question, response_type, system_prompt, history, audio, tenant,
+        meta={"response_type": response_type, "voice": audio is not None},
+    )
+    st.session_state[job_key] = job.id
+    st.session_state.pop(f"{job_key}_playback", None)
+    st.session_state.pop("playing_audio", None)
+    touch_session()
 
 def process_user_message():
     user_msg = st.session_state.chat_input.strip()
     if not user_msg:
         return
-    response_type = st.session_state.get("response_type_radio", "Text only")
-    st.session_state.chat_messages.append({"role": "user", "content": user_msg})
-    # Load context
-    cv_text = ""
-    if os.path.exists("assets/@claire.cv.txt"):
-        with open("assets/@claire.cv.txt","r",encoding="utf-8", errors="ignore") as f:
-            cv_text = f.read()
-    projects_text = "\n".join([f"{p['title']}: {p['description']}" for p in load_projects()])
-    faq_text = ""
-    if os.path.exists("assets/faq.json"):
-        with open("assets/faq.json", "r", encoding="utf-8") as f:
-            faq_data = json.load(f)
-            faq_text = json.dumps(faq_data, indent=2)
-    context = "\n\n".join([cv_text[:4000], projects_text[:3000], faq_text[:2000]])
-    system_prompt = (
-        "You are Claire's AI assistant. Respond with warmth, empathy, and a positive tone. "
-        "Always consider the FAQ data provided below and use it to answer questions when relevant. "
-        "If a question matches or relates to the FAQ, use the FAQ answer, but feel free to add a personal, sentimental touch. "
-        "If the FAQ does not cover the question, answer thoughtfully and helpfully.\n\nFAQ Data:\n" + faq_text
-    )
-    api_key = st.secrets.get("OPENAI_API_KEY")
-    if api_key:
-        with st.spinner("Thinking..."):
-            answer = openai_chat_completion(system_prompt, [{"role":"user","content": f"Context:\n{context}\n\nQuestion: {user_msg}"}], model=OPENAI_MODEL)
-        if response_type == "Text only":
-            st.session_state.chat_messages.append({"role": "assistant", "content": answer, "audio": None, "user_msg": user_msg})
-        elif response_type == "Speech only":
-            audio = eleven_tts_generate(answer)
-            st.session_state.chat_messages.append({"role": "assistant", "content": None, "audio": audio if audio else None, "user_msg": user_msg})
-        elif response_type == "Text & Speech":
-            audio = eleven_tts_generate(answer)
-            # Always set content to answer, even if audio is None
-            st.session_state.chat_messages.append({"role": "assistant", "content": answer, "audio": audio, "user_msg": user_msg})
-    else:
-        st.session_state.chat_messages.append({"role": "assistant", "content": "API key not configured. Please check your Streamlit secrets file and restart the app.", "audio": None, "user_msg": user_msg})
+    if chat_job_pending("chat_job_id"):
+        st.session_state.chat_notice = BUSY_NOTICE
+        return
+    response_type = st.session_state.get("response_type_radio", TEXT_ONLY)
+    history = chat_history(st.session_state.chat_messages)
+    remember(st.session_state.chat_messages, {"role": "user", "content": user_msg})
+    # Answered in the background; show_chat_job polls for the result
+    submit_chat_job("chat_job_id", user_msg, response_type, tenant.chat_prompt, history)
     st.session_state.chat_input = ""  # Clear input after processing
 
+def finish_chat_job(job, messages_key, audio):
+    """Persist a finished job's answer to the widget's message list"""
+    messages = st.session_state[messages_key]
+    result = job.result
+    if job.status == "failed":
+        remember(messages, {"role": "assistant", "content": f"Error: {job.error} (request {job.meta.get('request_id', job.id[:12])})", "audio_id": None})
+        return
+    if not result:
+        if job.meta.get("voice"):
+            st.session_state.chat_notice = "Sorry, I couldn't make out that recording."
+        return
+    if job.meta.get("voice"):
+        remember(messages, {"role": "user", "content": result["question"]})
+    if job.meta.get("prompt_tokens"):
+        st.session_state.prompt_tokens = job.meta["prompt_tokens"]
+    if job.meta.get("transcription_metrics"):
+        st.session_state.transcription_metrics = job.meta["transcription_metrics"]
+    if result.get("tts_metrics"):
+        st.session_state.tts_metrics = result["tts_metrics"]
+        if result["tts_metrics"]["failed"]:
+            st.session_state.chat_notice = f"{result['tts_metrics']['failed']} speech segment(s) could not be generated."
+    content = None if job.meta["response_type"] == SPEECH_ONLY else result["answer"]
+    # Audio lives in the shared store once; the message only references it
+    audio_id = get_audio_store().put(audio) if audio else None
+    # Always keep the answer text, even if audio is None; audio was already played
+    remember(messages, {"role": "assistant", "content": content, "audio_id": audio_id, "user_msg": result["question"], "source": result["source"], "played": audio is not None})
+
+def show_chat_job(job_key, messages_key, speaker):
+    """Show the widget's answer in progress; polling runs only while a job is in flight"""
+    job_id = st.session_state.get(job_key)
+    if job_id and get_job_manager(JOB_WORKERS).get(job_id) is not None:
+        poll_chat_job(job_key, messages_key, speaker)
+    else:
+        st.session_state.pop(job_key, None)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def poll_chat_job(job_key, messages_key, speaker):
+    """Poll a background chat job: stream its text, play its audio segments in order, then persist it.
+
+    Once the answer is saved the app reruns, which draws it in the widget's
+    history and drops this fragment, so idle tabs stop polling.
+    """
+    job_id = st.session_state.get(job_key)
+    job = get_job_manager(JOB_WORKERS).get(job_id) if job_id else None
+    if job is None:
+        st.session_state.pop(job_key, None)
+        st.rerun()
+    playback = st.session_state.setdefault(f"{job_key}_playback", {"next": 0, "busy_until": 0.0})
+    # Segments play back to back: start the next one once the previous has run its length
+    now = time.monotonic()
+    if playback["next"] < len(job.segments) and now >= playback["busy_until"]:
+        playback["busy_until"] = now + estimate_mp3_duration(job.segments[playback["next"]])
+        playback["next"] += 1
+    if job.done and playback["next"] >= len(job.segments) and now >= playback["busy_until"]:
+        finish_chat_job(job, messages_key, b"".join(job.segments) or None)
+        get_job_manager(JOB_WORKERS).forget(job.id)
+        st.session_state.pop(job_key, None)
+        st.session_state.pop(f"{job_key}_playback", None)
+        st.rerun()
+    if job.meta.get("voice"):
+        question = job.meta.get("question")
+        st.markdown(f"**You:** {question}" if question else "_Transcribing..._")
+    text = "".join(job.partial)
+    if job.meta["response_type"] != SPEECH_ONLY:
+        st.markdown(f"**{speaker}:** {text}{'' if job.done else '▌'}" if text else "_Thinking..._")
+    elif not job.done:
+        st.markdown("_Thinking..._")
+    if playback["next"] and now < playback["busy_until"]:
+        st.audio(job.segments[playback["next"] - 1], format="audio/mpeg", autoplay=True)
+
+@st.fragment
+@timed("render_chat")
 def add_chatbot_icon():
     """Add floating chatbot icon in bottom corner"""
     if 'show_chat' not in st.session_state:
@@ -202,35 +288,22 @@ def add_chatbot_icon():
     st.markdown("<div class='unified-chat-widget'><div class='unified-chat-content'>", unsafe_allow_html=True)
     # Show small floating profile picture instead of 💬 icon
     profile_img_html = ""
-    if os.path.exists("assets/profile.jpg"):
-        import base64
-        with open("assets/profile.jpg", "rb") as img_file:
-            img_data = base64.b64encode(img_file.read()).decode()
-        profile_img_html = f"<img src='data:image/jpeg;base64,{img_data}' alt='Profile' style='width:36px;height:36px;border-radius:50%;margin-right:8px;vertical-align:middle;border:2px solid #58a6ff;box-shadow:0 0 8px #58a6ff;'>"
-    st.markdown(f"### {profile_img_html} Talk To Claire", unsafe_allow_html=True)
+    img_uri = image_data_uri(tenant.profile_image, size=AVATAR_PX)
+    if img_uri:
+        profile_img_html = f"<img src='{img_uri}' alt='Profile' style='width:36px;height:36px;border-radius:50%;margin-right:8px;vertical-align:middle;border:2px solid #58a6ff;box-shadow:0 0 8px #58a6ff;'>"
+    st.markdown(f"### {profile_img_html} Talk To {tenant.first_name}", unsafe_allow_html=True)
 
     # User chooses response type
     response_type = st.session_state.get("response_type_radio")
 
     # Display messages
-    if response_type == "Speech only":
+    if response_type == SPEECH_ONLY:
         # Only play the latest assistant speech response, no text
         warning_shown = False
         for i, msg in enumerate(reversed(st.session_state.chat_messages)):
             if msg.get("role") == "assistant":
-                audio_bytes = msg.get("audio")
-                if audio_bytes:
-                    import base64
-                    b64_audio = base64.b64encode(audio_bytes).decode()
-                    st.markdown(f"""
-                    <audio id='ai_audio_{i}' src='data:audio/wav;base64,{b64_audio}' autoplay>
-                        Your browser does not support the audio element.
-                    </audio>
-                    <script>
-                    var audio = document.getElementById('ai_audio_{i}');
-                    if (audio) {{ audio.play(); }}
-                    </script>
-                    """, unsafe_allow_html=True)
+                if msg.get("audio_id"):
+                    render_message_audio(msg, f"speech_{i}")
                 else:
                     # Show visible warning if no audio generated
                     st.warning("No audio was generated for the last response. Please check your ElevenLabs API settings or try again.")
@@ -241,31 +314,24 @@ def add_chatbot_icon():
             if msg["role"] == "user":
                 st.markdown(f"**You:** {msg['content']}")
             else:
-                st.markdown(f"**Claire:** {msg['content']}")
-                if msg.get("audio"):
-                    import base64
-                    audio_bytes = msg["audio"]
-                    if audio_bytes:
-                        b64_audio = base64.b64encode(audio_bytes).decode()
-                        st.markdown(f"""
-                        <audio id='ai_audio_{i}' src='data:audio/wav;base64,{b64_audio}' autoplay>
-                            Your browser does not support the audio element.
-                        </audio>
-                        <script>
-                        var audio = document.getElementById('ai_audio_{i}');
-                        if (audio) {{ audio.play(); }}
-                        </script>
-                        """, unsafe_allow_html=True)
+                st.markdown(f"**{tenant.first_name}:** {msg['content']}")
+                if msg.get("audio_id"):
+                    render_message_audio(msg, f"text_{i}")
+
+    # Answer in progress (streams in while the rest of the page stays responsive)
+    show_chat_job("chat_job_id", "chat_messages", tenant.first_name)
+    if st.session_state.get("chat_notice"):
+        st.warning(st.session_state.pop("chat_notice"))
 
     # Clear button for text responses
     if st.button("Clear Text Responses", key="chat_clear"):
         st.session_state.chat_messages = []
-        st.rerun()
+        st.rerun(scope="fragment")
 
     # User chooses response type
     response_type = st.radio(
         "Choose response type:",
-        ["Text only", "Speech only", "Text & Speech"],
+        RESPONSE_TYPES,
         index=0,
         horizontal=True,
         key="response_type_radio"
@@ -277,6 +343,21 @@ def add_chatbot_icon():
         key="chat_input",
         on_change=process_user_message
     )
+
+    # Voice input: each new recording is transcribed and queued like a typed question
+    if app_settings().openai_api_key:
+        recording = st.audio_input("Or ask by voice", key="voice_input")
+        if recording is not None:
+            audio_bytes = recording.getvalue()
+            recording_id = hashlib.sha256(audio_bytes).hexdigest()
+            if st.session_state.get("last_voice_id") != recording_id:
+                st.session_state.last_voice_id = recording_id
+                if chat_job_pending("chat_job_id"):
+                    st.session_state.chat_notice = BUSY_NOTICE
+                else:
+                    submit_chat_job("chat_job_id", None, response_type, tenant.chat_prompt, chat_history(st.session_state.chat_messages),
+                                    audio=(recording.name, audio_bytes, recording.type or "audio/wav"))
+                st.rerun(scope="fragment")
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 # ---------- Helper: AI Assistant Widget ----------
@@ -389,11 +470,8 @@ def show_ai_assistant():
     """, unsafe_allow_html=True)
     
     # Display clickable floating profile picture
-    if os.path.exists("assets/profile.jpg"):
-        import base64
-        with open("assets/profile.jpg", "rb") as img_file:
-            img_data = base64.b64encode(img_file.read()).decode()
-        
+    img_uri = image_data_uri(tenant.profile_image, size=AVATAR_PX)
+    if img_uri:
         # Clickable button first (will be positioned over the image with CSS)
         if st.button("💬 Chat", key=f"avatar_btn_{page}"):
             st.session_state.show_assistant = not st.session_state.show_assistant
@@ -403,7 +481,7 @@ def show_ai_assistant():
         st.markdown(f"""
         <div class="ai-assistant-float">
             <div class="ai-assistant-avatar">
-                <img src="data:image/jpeg;base64,{img_data}" alt="AI Chatbot">
+                <img src="{img_uri}" alt="AI Chatbot">
                 <div class="microphone-badge">💬</div>
             </div>
         </div>
@@ -420,6 +498,7 @@ def show_ai_assistant():
                     st.markdown(f"**You:** {msg['content']}")
                 else:
                     st.markdown(f"**AI:** {msg['content']}")
+            show_chat_job("ai_job_id", "ai_messages", "AI")
             
             # Input area
             col1, col2 = st.columns([3, 1])
@@ -439,39 +518,75 @@ def show_ai_assistant():
                     st.rerun()
             
             # Process question
-            if send_btn and user_input.strip():
+            if send_btn and user_input.strip() and chat_job_pending("ai_job_id"):
+                st.warning(BUSY_NOTICE)
+            elif send_btn and user_input.strip():
                 question = user_input.strip()
-                st.session_state.ai_messages.append({"role": "user", "content": question})
-                if not OPENAI_API_KEY:
-                    st.session_state.ai_messages.append({"role": "assistant", "content": "OpenAI API key not configured."})
-                else:
-                    # Load context
-                    cv_text = ""
-                    if os.path.exists("assets/@claire.cv.txt"):
-                        with open("assets/@claire.cv.txt","r",encoding="utf-8", errors="ignore") as f:
-                            cv_text = f.read()
-                    projects_text = "\n".join([f"{p['title']}: {p['description']}" for p in load_projects()])
-                    faq_text = ""
-                    if os.path.exists("assets/faq.json"):
-                        with open("assets/faq.json", "r", encoding="utf-8") as f:
-                            faq_data = json.load(f)
-                            faq_text = json.dumps(faq_data, indent=2)
-                    context_text = "\n\n".join([cv_text[:4000], projects_text[:3000], faq_text[:2000]])
-                    system_prompt = """You are Claire Namusoke's AI assistant. Answer questions professionally and concisely.\nMatch user questions to FAQ data semantically. Prioritize FAQ answers when available."""
-                    with st.spinner("Thinking..."):
-                        answer = openai_chat_completion(system_prompt, [{"role":"user","content": f"Context:\n{context_text}\n\nQuestion: {question}"}])
-                    # Only append one assistant response, then rerun
-                    st.session_state.ai_messages.append({"role": "assistant", "content": answer})
+                remember(st.session_state.ai_messages, {"role": "user", "content": question})
+                submit_chat_job("ai_job_id", question, TEXT_ONLY, tenant.assistant_prompt, chat_history(st.session_state.ai_messages[:-1]))
                 st.rerun()
 
+# ---------- Helper: Operator Stats ----------
+def show_operator_stats():
+    """Cache statistics for operators, shown in the sidebar with ?stats=1"""
+    if not st.query_params.get("stats"):
+        return
+    with st.sidebar:
+        st.subheader("Operator stats")
+        service_stats = get_service().stats(tenant)
+        st.markdown("**Knowledge base**")
+        st.json(service_stats["knowledge_base"])
+        st.markdown(f"**Portfolio caches (shared, bounded; serving `{tenant.id}`)**")
+        st.json(cache_stats())
+        st.markdown("**Pre-rendered page fragments**")
+        st.json(page_fragment_stats)
+        st.markdown(f"**Pre-computed FAQ (`{tenant.id}`)**")
+        st.json(service_stats["faq_artifact"])
+        st.markdown("**Response cache**")
+        st.json(service_stats["response_cache"])
+        st.markdown("**Background jobs**")
+        st.json(get_job_manager(JOB_WORKERS).snapshot())
+        st.markdown("**Provider circuit breakers**")
+        st.json(service_stats["circuit_breakers"])
+        st.markdown("**Provider queues and coalescing**")
+        st.json({"queues": service_stats["provider_queues"], "coalescing": service_stats["coalescing"]})
+        st.markdown("**Audio store**")
+        st.json(get_audio_store().snapshot())
+        st.markdown("**TTS audio cache**")
+        st.json(service_stats["tts_audio_cache"])
+        st.markdown("**Sessions (memory held in session state)**")
+        st.json(dict(sessions.snapshot(), this_session_bytes=deep_sizeof(st.session_state.to_dict())))
+        st.markdown("**Stage latency and counters**")
+        st.json(metrics.snapshot())
+        if st.session_state.get("prompt_tokens"):
+            st.markdown("**Last prompt (tokens)**")
+            st.json(st.session_state.prompt_tokens)
+        if st.session_state.get("transcription_metrics"):
+            st.markdown("**Last voice transcription (seconds)**")
+            st.json(st.session_state.transcription_metrics)
+        if st.session_state.get("tts_metrics"):
+            st.markdown("**Last TTS pipeline (seconds)**")
+            st.json(st.session_state.tts_metrics)
+
 # ---------- Navigation ----------
+if st.session_state.get("tenant_id") != tenant.id:
+    # Conversations and filters belong to the portfolio they started on
+    get_job_manager(JOB_WORKERS).cancel_session(get_session_id())
+    for key in ("chat_messages", "ai_messages", "chat_job_id", "ai_job_id", "project_query", "project_tools", "project_page"):
+        st.session_state.pop(key, None)
+    st.session_state.tenant_id = tenant.id
 prev_page = st.session_state.get("prev_page")
 page = st.radio("Navigation", ["About","Projects"], horizontal=True, label_visibility="collapsed")
 
 if prev_page != page:
     st.session_state.chat_input = ""
     st.session_state.chat_messages = []
+    # Drop answers still being generated for the page the visitor left
+    get_job_manager(JOB_WORKERS).cancel_session(get_session_id())
+    for job_key in ("chat_job_id", "ai_job_id"):
+        st.session_state.pop(job_key, None)
 st.session_state.prev_page = page
+render_start = time.perf_counter()
 
 # ---------- About ----------
 if page == "About":
@@ -479,81 +594,14 @@ if page == "About":
     # Create columns for image and text
     col1, col2 = st.columns([1, 3])
     with col1:
-        if os.path.exists("assets/profile.jpg"):
-            st.image("assets/profile.jpg", width=100)
+        if os.path.exists(tenant.profile_image):
+            st.image(tenant.profile_image, width=100)
         else:
             st.info("Profile image not found")
     with col2:
-        about = """Hi,  I am Claire, a data analytics enthusiast and International Shipping and chartering student at Hochschule Bremen, 
-             with practical experience in analyzing shipping data, environmental impacts, and 
-             global trade trends. I specialize in transforming complex datasets into actionable 
-             insights through SQL, Python, Power BI, and interactive dashboards, while integrating
-              AI for smarter analysis. Passionate about applying data to real-world shipping and
-              Business environments to drive informed decision-making and sustainability initiatives.   
-    """
-        st.write(about)
-    st.markdown("""
-    <div style='display: flex; gap: 30px; align-items: start;'>
-        <div>
-            <h3 style='margin-top: 0; margin-bottom: 16px;'>Certifications</h3>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Supply Chain Management and Analytics</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Introduction to Data Analytics</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>SQL & Databases</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Power BI</p>
-        </div>
-        <div>
-            <h3 style='margin-top: 0; margin-bottom: 16px; opacity: 0;'>.</h3>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Coursera</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Coursera</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Udemy</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Udemy</p>
-        </div>
-        <div style='margin-left: 300px;'>
-            <h3 style='margin-top: 0; margin-bottom: 16px;'>Interests</h3>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Data Analysis</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Logistics and Supply Chain</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Maritime Analytics</p>
-            <p style='margin-top: 0; margin-bottom: 16px;'>Chartering Practises</p>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-    st.subheader("Data Skills")
-    # Animated skill badges
-    st.markdown("""
-    <style>
-    @keyframes pulse {
-        0%, 100% { transform: scale(1); }
-        50% { transform: scale(1.1); }
-    }
-    .skill-badge {
-        display: inline-block;
-        margin: 5px;
-        padding: 8px 15px;
-        background: linear-gradient(135deg, #1f5a8a 0%, #14406b 100%);
-        color: white;
-        border-radius: 20px;
-        font-weight: bold;
-        animation: pulse 2s ease-in-out infinite;
-    }
-    .skill-badge:nth-child(2) { animation-delay: 0.2s; }
-    .skill-badge:nth-child(3) { animation-delay: 0.4s; }
-    .skill-badge:nth-child(4) { animation-delay: 0.6s; }
-    .skill-badge:nth-child(5) { animation-delay: 0.8s; }
-    .skill-badge:nth-child(6) { animation-delay: 1s; }
-    </style>
-    <div>
-        <span class="skill-badge">🐍 Python</span>
-        <span class="skill-badge">🗄️ SQL</span>
-        <span class="skill-badge">📊 Power BI</span>
-        <span class="skill-badge">⚡ Streamlit</span>
-        <span class="skill-badge">📂 Git/GitHub</span>
-        <span class="skill-badge">💼 MS Office</span>
-    </div>
-    """, unsafe_allow_html=True)
-    st.subheader("Contact")
-    st.markdown("- **LinkedIn:** [LinkedIn](https://www.linkedin.com/in/namusoke-claire-129711335)")
-    st.markdown("- **GitHub:** [claire-namusoke](https://github.com/claire-namusoke)")
-    st.markdown("- **Email:** clairenamusoke1@gmail.com")
+        st.write(about_text(tenant.profile) or f"Welcome to {tenant.name}'s portfolio.")
+    # Certifications, skills and contact are pre-rendered once (see pages.py)
+    st.markdown(about_html(tenant.profile), unsafe_allow_html=True)
     provide_cv_download()
     # Add bottom AI chat widget with options
     add_chatbot_icon()
@@ -561,21 +609,50 @@ if page == "About":
 # ---------- Projects ----------
 elif page == "Projects":
     st.header("Projects")
-    projects = load_projects()
-    if projects:
-        for p in projects:
-            st.subheader(f"🔗 [{p.get('title')}]({p.get('link')})")
-            # Description is hidden in UI, but available for AI
-            # st.write(p.get("description"))
-            # Display tools used
-            if p.get("tools"):
-                tools_str = " • ".join(p.get("tools"))
-                st.markdown(f"<p style='color: #58a6ff;'><strong>Tools:</strong> {tools_str}</p>", unsafe_allow_html=True)
-            st.markdown("---")
+    snapshot = tenant.knowledge()
+    cards = project_cards(snapshot)
+    if cards:
+        index = get_project_index(snapshot)
+
+        def reset_project_page():
+            st.session_state.project_page = 1
+
+        search_col, tools_col = st.columns([2, 3])
+        with search_col:
+            query = st.text_input("Search projects", key="project_query", placeholder="Title or description",
+                                  on_change=reset_project_page)
+        with tools_col:
+            tools = st.multiselect("Tools", index.tools, key="project_tools", on_change=reset_project_page)
+        matches = index.search(query, tools)
+        # Only the visible slice is sent to the browser
+        visible, page_no, pages = paginate(matches, st.session_state.get("project_page", 1), PROJECTS_PER_PAGE)
+        st.session_state.project_page = page_no
+        st.caption(f"{len(matches)} of {len(cards)} projects")
+        if visible:
+            st.markdown("".join(cards[i] for i in visible), unsafe_allow_html=True)
+        else:
+            st.info("No projects match this search.")
+        if pages > 1:
+            prev_col, label_col, next_col = st.columns([1, 2, 1])
+            with prev_col:
+                if st.button("Previous", key="project_prev", disabled=page_no <= 1):
+                    st.session_state.project_page = page_no - 1
+                    st.rerun()
+            with label_col:
+                st.markdown(f"<div style='text-align:center'>Page {page_no} of {pages}</div>", unsafe_allow_html=True)
+            with next_col:
+                if st.button("Next", key="project_next", disabled=page_no >= pages):
+                    st.session_state.project_page = page_no + 1
+                    st.rerun()
     else:
-        st.info("No projects found. Add them in assets/projects.json")
+        st.info(f"No projects found. Add them in {tenant.projects_file}")
     # Add bottom AI chat widget with options
     add_chatbot_icon()
 
 st.markdown("<hr>", unsafe_allow_html=True)
-st.caption("Made with Streamlit • Claire Namusoke")
+st.caption(f"Made with Streamlit • {tenant.name}")
+record("render_page", time.perf_counter() - render_start, page=page)
+touch_session()
+if METRICS_FILE:
+    metrics.write_textfile(METRICS_FILE)
+show_operator_stats()
@@ -0,0 +1,87 @@
+"""In-memory index over projects.json for search, tool filters and paging.
+
+Built once per knowledge version: an inverted index from title and
+description words to projects, and one from each tool to the projects
+that use it. A query intersects the posting sets and returns project
+positions in projects.json order, so a rerun only renders the slice
+being shown.
+"""
+import re
+from bisect import bisect_left
+
+from bounded_cache import BoundedCache
+from knowledge import load_knowledge
+
+PAGE_SIZE = 10
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text):
+    return set(_WORD_RE.findall(str(text).lower()))
+
+
+class ProjectIndex:
+    def __init__(self, projects):
+        self.size = len(projects)
+        self.by_word = {}
+        self.by_tool = {}
+        tool_names = {}
+        for i, project in enumerate(projects):
+            for word in _words(project.get("title", "")) | _words(project.get("description", "")):
+                self.by_word.setdefault(word, set()).add(i)
+            for tool in project.get("tools") or []:
+                key = str(tool).strip().lower()
+                if key:
+                    tool_names.setdefault(key, str(tool).strip())
+                    self.by_tool.setdefault(key, set()).add(i)
+        # Most used tools first, for the filter options
+        self.tools = [tool_names[k] for k in sorted(self.by_tool, key=lambda k: (-len(self.by_tool[k]), k))]
+        self._vocabulary = sorted(self.by_word)
+        self._prefix_cache = {}
+
+    def _word_matches(self, word):
+        """Projects containing a word that starts with ``word`` (search-as-you-type)."""
+        cached = self._prefix_cache.get(word)
+        if cached is None:
+            cached = set()
+            # Words sharing the prefix are contiguous in the sorted vocabulary
+            for candidate in self._vocabulary[bisect_left(self._vocabulary, word):]:
+                if not candidate.startswith(word):
+                    break
+                cached |= self.by_word[candidate]
+            if len(self._prefix_cache) > 1024:
+                self._prefix_cache.clear()
+            self._prefix_cache[word] = cached
+        return cached
+
+    def search(self, query="", tools=()):
+        """Positions of projects matching every query word and using every selected tool."""
+        sets = [self.by_tool.get(str(t).strip().lower(), set()) for t in tools]
+        sets += [self._word_matches(w) for w in _words(query)]
+        if not sets:
+            return list(range(self.size))
+        sets.sort(key=len)
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+            if not result:
+                break
+        return sorted(result)
+
+
+def paginate(ids, page, page_size=PAGE_SIZE):
+    """Return (slice, page, pages) with page clamped to the valid range (1-based)."""
+    pages = max(1, -(-len(ids) // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return ids[start:start + page_size], page, pages
+
+
+_indexes = BoundedCache("project_indexes")
+
+
+def get_project_index(snapshot=None):
+    """Return the index for this knowledge version, building it once."""
+    snapshot = snapshot or load_knowledge()
+    return _indexes.get_or_build(snapshot.version, lambda: ProjectIndex(snapshot.projects))
@@ -0,0 +1,134 @@
+"""Token-budgeted prompt assembly with conversation-history windowing.
+
+The prompt is built from four parts — system prompt, retrieved context,
+recent history and the question — each held to a token budget counted
+with a local tokenizer. Context chunks are added best-first until their
+budget is spent; history keeps the newest turns that fit and folds older
+turns into a one-line summary. Every build returns a per-section token
+report.
+"""
+import re
+from dataclasses import dataclass
+
+from shared import process_wide
+
+CONTEXT_TOKENS = 1500
+HISTORY_TOKENS = 600
+SUMMARY_TOKENS = 120
+QUESTION_TOKENS = 300
+MESSAGE_OVERHEAD_TOKENS = 4  # role/separator tokens per chat message
+
+_APPROX_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _approx_count(text):
+    # ~ one token per short word or symbol, long words cost one per 4 chars
+    return sum(max(1, (len(piece) + 3) // 4) for piece in _APPROX_RE.findall(text))
+
+
+def _load_counter(model):
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return lambda text: len(encoding.encode(text))
+    except Exception:
+        # Not installed, or the BPE file cannot be downloaded (offline)
+        return _approx_count
+
+
+def get_token_counter(model="gpt-4o-mini"):
+    """tiktoken's encoder for the model if it can be loaded, else an offline estimate."""
+    return process_wide("token_counter", _load_counter, model)
+
+
+def count_tokens(text):
+    return get_token_counter()(text or "")
+
+
+def truncate_to_tokens(text, limit):
+    """Cut text to roughly limit tokens, on a word boundary."""
+    if count_tokens(text) <= limit:
+        return text
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid]) + " …") <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo]) + " …"
+
+
+@dataclass(frozen=True)
+class PromptBudget:
+    context: int = CONTEXT_TOKENS
+    history: int = HISTORY_TOKENS
+    summary: int = SUMMARY_TOKENS
+    question: int = QUESTION_TOKENS
+
+
+def _summarize_turns(turns, limit):
+    """Extractive one-liner of older turns: the visitor's earlier questions."""
+    questions = [t["content"].strip() for t in turns if t["role"] == "user" and t.get("content")]
+    if not questions:
+        return ""
+    summary = "Earlier in this conversation the visitor asked: " + "; ".join(questions)
+    return truncate_to_tokens(summary, limit)
+
+
+def build_prompt(system_prompt, question, context_chunks, history=(), budget=None):
+    """Return (system_prompt, messages, report) for a chat completion.
+
+    ``context_chunks`` are strings ordered best-first; ``history`` is the
+    prior conversation as {"role", "content"} dicts, oldest first.
+    """
+    budget = budget or PromptBudget()
+    report = {"system": count_tokens(system_prompt)}
+
+    question = truncate_to_tokens(question, budget.question)
+    report["question"] = count_tokens(question)
+
+    context_parts, used = [], 0
+    for chunk in context_chunks:
+        cost = count_tokens(chunk)
+        if used + cost > budget.context:
+            continue
+        context_parts.append(chunk)
+        used += cost
+    report["context"] = used
+    report["context_chunks"] = len(context_parts)
+    report["context_chunks_dropped"] = len(context_chunks) - len(context_parts)
+
+    turns = [t for t in history if t.get("role") in ("user", "assistant") and t.get("content")]
+    kept, used = [], 0
+    for turn in reversed(turns):
+        cost = count_tokens(turn["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > budget.history:
+            break
+        kept.append({"role": turn["role"], "content": turn["content"]})
+        used += cost
+    kept.reverse()
+    # The kept window must start with a user turn
+    while kept and kept[0]["role"] != "user":
+        used -= count_tokens(kept.pop(0)["content"]) + MESSAGE_OVERHEAD_TOKENS
+    older = turns[:len(turns) - len(kept)]
+    report["history"] = used
+    report["history_turns"] = len(kept)
+    report["history_turns_summarized"] = len(older)
+
+    summary = _summarize_turns(older, budget.summary)
+    report["summary"] = count_tokens(summary)
+    if summary:
+        system_prompt = f"{system_prompt}\n\n{summary}"
+
+    context = "\n\n".join(context_parts)
+    messages = kept + [{"role": "user", "content": f"Context:\n{context}\n\nQuestion: {question}"}]
+    report["total"] = (
+        report["system"] + report["summary"] + report["context"] + report["history"]
+        + report["question"] + MESSAGE_OVERHEAD_TOKENS * (len(messages) + 1)
+    )
+    return system_prompt, messages, report
@@ -0,0 +1,358 @@
+"""Shared provider clients with retries and circuit breaking.
+
+OpenAI clients and the HTTP session used for ElevenLabs are created once
+per process and reused, so requests share keep-alive connections instead
+of paying TLS setup every time. Calls go through ``call_with_retries``,
+which retries 429/5xx and connection errors with exponential backoff and
+fails fast while a provider's circuit is open. Calls per provider are
+admitted through a token bucket (request rate) and a semaphore (in-flight
+cap) shared by every session, so bursts queue instead of tripping the
+provider's rate limits; a call that would queue too long is refused with
+``ProviderBusy`` so the app can answer "busy" rather than fail.
+
+The ``openai`` and ``requests`` packages are imported on first use, so
+pages that never call a provider do not pay for loading them.
+"""
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from shared import process_wide
+from telemetry import metrics
+
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 8
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30
+POOL_SIZE = 16
+PROVIDER_CONCURRENCY = {"openai": 8, "elevenlabs": 4}
+PROVIDER_RATES = {"openai": (10.0, 20), "elevenlabs": (10.0, 20)}  # requests/second, burst
+QUEUE_TIMEOUT = 10  # longest a call may wait for admission before it is refused as busy
+MAX_QUEUE = 64  # waiting calls per provider beyond which new calls are refused at once
+
+
+class ProviderUnavailable(Exception):
+    """Raised without calling the provider while its circuit is open."""
+
+
+class ProviderBusy(ProviderUnavailable):
+    """Raised when a call would wait too long for a rate-limit token or slot."""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after reset_timeout."""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "retries": 0, "opened": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "open":
+                self.stats["rejected"] += 1
+                return False
+            if state == "half_open":
+                # Only one trial call; the rest fail fast until it succeeds
+                self.opened_at = time.monotonic()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.stats["successes"] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    self.stats["opened"] += 1
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, state=self.state, consecutive_failures=self.failures)
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider):
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker()
+        return _breakers[provider]
+
+
+def breaker_stats():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: b.snapshot() for name, b in breakers.items()}
+
+
+# ---------- Admission: rate limits and concurrency ----------
+class TokenBucket:
+    """Allows ``rate`` calls per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout):
+        """Take a token; returns seconds to wait before using it, or None if that exceeds timeout."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if wait > timeout:
+                return None
+            self.tokens -= 1
+            return wait
+
+
+_limits = dict(PROVIDER_CONCURRENCY)
+_rates = dict(PROVIDER_RATES)
+_queue_timeout = QUEUE_TIMEOUT
+_slots = {}
+_buckets = {}
+_queues = {}
+_slots_lock = threading.Lock()
+
+
+def configure_provider_limits(limits, rates=None, queue_timeout=None):
+    """Set max in-flight calls, (rate, burst) and the queue timeout (idempotent for unchanged values)."""
+    global _queue_timeout
+    with _slots_lock:
+        for provider, limit in limits.items():
+            if _limits.get(provider) != limit:
+                _limits[provider] = limit
+                _slots.pop(provider, None)
+        for provider, rate in (rates or {}).items():
+            if _rates.get(provider) != rate:
+                _rates[provider] = rate
+                _buckets.pop(provider, None)
+        if queue_timeout is not None:
+            _queue_timeout = queue_timeout
+
+
+def provider_slot(provider):
+    """Semaphore bounding concurrent calls to a provider across the process."""
+    with _slots_lock:
+        if provider not in _slots:
+            _slots[provider] = threading.BoundedSemaphore(_limits.get(provider, POOL_SIZE))
+        return _slots[provider]
+
+
+def _bucket(provider):
+    with _slots_lock:
+        if provider not in _buckets:
+            rate, burst = _rates.get(provider, (float(POOL_SIZE), POOL_SIZE))
+            _buckets[provider] = TokenBucket(rate, burst)
+        return _buckets[provider]
+
+
+def _queue(provider):
+    with _slots_lock:
+        if provider not in _queues:
+            _queues[provider] = {"waiting": 0, "max_waiting": 0, "admitted": 0, "busy": 0, "wait_seconds": 0.0}
+        return _queues[provider]
+
+
+@contextmanager
+def provider_admission(provider):
+    """Wait for a rate-limit token and a concurrency slot; ProviderBusy if that takes too long."""
+    queue = _queue(provider)
+    start = time.monotonic()
+    with _slots_lock:
+        if queue["waiting"] >= MAX_QUEUE:
+            queue["busy"] += 1
+            raise ProviderBusy(f"{provider} queue is full")
+        queue["waiting"] += 1
+        queue["max_waiting"] = max(queue["max_waiting"], queue["waiting"])
+    slot = None
+    try:
+        wait = _bucket(provider).reserve(_queue_timeout)
+        if wait is not None:
+            time.sleep(wait)
+            candidate = provider_slot(provider)
+            if candidate.acquire(timeout=max(0.0, _queue_timeout - (time.monotonic() - start))):
+                slot = candidate
+    finally:
+        waited = time.monotonic() - start
+        with _slots_lock:
+            queue["waiting"] -= 1
+            if slot is None:
+                queue["busy"] += 1
+            else:
+                queue["admitted"] += 1
+                queue["wait_seconds"] += waited
+    if slot is None:
+        raise ProviderBusy(f"{provider} is busy, please try again shortly")
+    metrics.observe("provider_wait_seconds", waited, provider=provider)
+    try:
+        yield
+    finally:
+        slot.release()
+
+
+def admission_stats():
+    """Queue depth, admissions, busy refusals and total wait per provider."""
+    with _slots_lock:
+        return {provider: dict(q) for provider, q in _queues.items()}
+
+
+# ---------- Retries ----------
+def _status_code(exc):
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def _connection_errors():
+    # An exception from a provider SDK means it is already imported; never import it here
+    errors = []
+    if "openai" in sys.modules:
+        errors.append(sys.modules["openai"].APIConnectionError)
+    if "requests" in sys.modules:
+        errors += [sys.modules["requests"].ConnectionError, sys.modules["requests"].Timeout]
+    return tuple(errors)
+
+
+def is_retryable(exc):
+    """429, 5xx, timeouts and connection errors are worth retrying."""
+    status = _status_code(exc)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, _connection_errors())
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class HeldStream:
+    """Iterates a streaming response, keeping its admission slot until it is exhausted or closed."""
+
+    def __init__(self, stream, admission):
+        self._stream = stream
+        self._iter = iter(stream)
+        self._admission = admission
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iter)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        admission, self._admission = self._admission, None
+        if admission is None:
+            return
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            admission.__exit__(None, None, None)
+
+    def __del__(self):
+        self.close()
+
+
+def call_with_retries(provider, fn, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, max_backoff=MAX_BACKOFF_SECONDS,
+                      stream=False):
+    """Call fn(), retrying transient provider errors with exponential backoff.
+
+    With ``stream=True`` fn returns a streaming response, which comes back
+    as a HeldStream: the concurrency slot stays taken while it is read.
+    """
+    breaker = get_breaker(provider)
+    if not breaker.allow():
+        raise ProviderUnavailable(f"{provider} is temporarily unavailable, please try again shortly")
+    attempt = 0
+    while True:
+        try:
+            admission = provider_admission(provider)
+            admission.__enter__()
+            try:
+                result = fn()
+            except BaseException:
+                admission.__exit__(None, None, None)
+                raise
+            if stream:
+                result = HeldStream(result, admission)
+            else:
+                admission.__exit__(None, None, None)
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            if attempt >= retries:
+                breaker.record_failure()
+                raise
+            delay = _retry_after(e) or backoff * (2 ** attempt)
+            time.sleep(min(max_backoff, delay) * random.uniform(0.8, 1.2))
+            attempt += 1
+            breaker.stats["retries"] += 1
+            continue
+        breaker.record_success()
+        return result
+
+
+# ---------- Clients ----------
+def _openai_client(api_key, base_url, timeout):
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, max_retries=0)
+
+
+def get_openai_client(api_key, base_url=None, timeout=DEFAULT_TIMEOUT):
+    """Process-wide OpenAI client (pooled connections; retries are ours, not the SDK's)."""
+    return process_wide("openai_client", _openai_client, api_key, base_url, timeout)
+
+
+def _http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session():
+    """Process-wide requests.Session with a keep-alive connection pool."""
+    return process_wide("http_session", _http_session)
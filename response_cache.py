@@ -0,0 +1,124 @@
+"""Cache for chat completions keyed on a prompt fingerprint.
+
+Two tiers: an in-memory LRU shared by all sessions in the process and an
+optional SQLite file that survives restarts. Entries expire after a TTL
+and every key includes the knowledge-base version, so editing the assets
+invalidates previously cached answers.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from shared import process_wide
+
+MAX_ENTRIES = 512
+DISK_MAX_ENTRIES = 5000
+TTL_SECONDS = 24 * 3600
+
+
+def prompt_fingerprint(model, system_prompt, messages, temperature, max_tokens, version=""):
+    """Stable hash of everything that determines a completion."""
+    payload = json.dumps(
+        [model, system_prompt, messages, temperature, max_tokens, version],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU with an optional SQLite tier and TTL expiry."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, db_path=None, disk_max_entries=DISK_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_max_entries = disk_max_entries
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, created REAL, accessed REAL)"
+            )
+            self._db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self.stats["expired"] += 1
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value, created = row
+                    if now - created <= self.ttl:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._put_memory(key, value, created)
+                        self.stats["hits"] += 1
+                        self.stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                    self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, value, now)
+            self.stats["sets"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,),
+                )
+                self._db.commit()
+
+    def _put_memory(self, key, value, created):
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def snapshot(self):
+        """Counters plus current sizes, for the operator stats panel."""
+        with self._lock:
+            info = dict(self.stats)
+            info["memory_entries"] = len(self._memory)
+            if self._db is not None:
+                info["disk_entries"] = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = info["hits"] + info["misses"]
+        info["hit_rate"] = round(info["hits"] / lookups, 3) if lookups else 0.0
+        return info
+
+
+def get_response_cache(db_path=None, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+    """Return the process-wide ResponseCache, creating it on first use."""
+    return process_wide("response_cache", ResponseCache, max_entries, ttl, db_path)
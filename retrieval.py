@@ -0,0 +1,168 @@
+"""Chunking and top-k retrieval over the CV, projects and FAQ.
+
+Instead of pasting truncated copies of every asset into each prompt, the
+assets are split into chunks, embedded once per knowledge version and
+searched with cosine similarity so only the relevant chunks are sent.
+"""
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from bounded_cache import BoundedCache
+from knowledge import load_knowledge
+from providers import call_with_retries, get_openai_client
+
+CHUNK_CHARS = 600
+TOP_K = 6
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class Chunk:
+    source: str  # "faq", "project" or "cv"
+    text: str
+
+
+def _split_paragraphs(text, max_chars=CHUNK_CHARS):
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks, current = [], ""
+    for para in paragraphs:
+        if current and len(current) + len(para) + 2 > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}\n\n{para}" if current else para
+        while len(current) > max_chars:
+            cut = current.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            chunks.append(current[:cut].strip())
+            current = current[cut:].strip()
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_knowledge(snapshot, max_chars=CHUNK_CHARS):
+    """Split a KnowledgeSnapshot into retrievable chunks."""
+    chunks = []
+    for item in snapshot.faq:
+        chunks.append(Chunk("faq", f"Q: {item.get('question', '')}\nA: {item.get('answer', '')}"))
+    for p in snapshot.projects:
+        header = f"Project: {p.get('title', '')}"
+        if p.get("tools"):
+            header += f" (tools: {', '.join(p['tools'])})"
+        for part in _split_paragraphs(p.get("description", ""), max_chars):
+            chunks.append(Chunk("project", f"{header}\n{part}"))
+    for part in _split_paragraphs(snapshot.cv_text, max_chars):
+        chunks.append(Chunk("cv", f"CV: {part}"))
+    return chunks
+
+
+# ---------- Embedding backends ----------
+class HashingEmbedder:
+    """Deterministic offline embedder (hashed unigrams + bigrams).
+
+    Needs no network access, so it doubles as the stand-in for tests and
+    benchmarks and as the fallback when the remote backend fails.
+    """
+    name = "hashing"
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def _bucket(self, feature):
+        h = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(h, "little")
+        return value % self.dim, 1.0 if (value >> 63) & 1 else -1.0
+
+    def embed(self, texts):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                col, sign = self._bucket(feature)
+                out[row, col] += sign
+        return _normalize(out)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API."""
+
+    def __init__(self, api_key, model="text-embedding-3-small", base_url=None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.name = f"openai:{model}"
+
+    def embed(self, texts):
+        client = get_openai_client(self.api_key, self.base_url)
+        resp = call_with_retries("openai", lambda: client.embeddings.create(model=self.model, input=list(texts)))
+        return _normalize(np.array([d.embedding for d in resp.data], dtype=np.float32))
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+# ---------- Index ----------
+class VectorIndex:
+    """In-memory cosine-similarity index over chunks."""
+
+    def __init__(self, chunks, embedder):
+        self.chunks = chunks
+        self.embedder = embedder
+        self.matrix = embedder.embed([c.text for c in chunks]) if chunks else None
+
+    def search(self, query, k=TOP_K):
+        """Return up to k (score, chunk) pairs, best first."""
+        if self.matrix is None or not query.strip():
+            return []
+        q = self.embedder.embed([query])[0]
+        scores = self.matrix @ q
+        k = min(k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top]
+
+
+# Room for the configured embedder and the hashing fallback per portfolio
+_indexes = BoundedCache("retrieval_indexes", per_portfolio=2)
+_index_lock = threading.Lock()
+
+
+def get_index(embedder, snapshot=None):
+    """Return the index for this embedder and knowledge version, building it once."""
+    snapshot = snapshot or load_knowledge()
+    key = (embedder.name, snapshot.version)
+    index = _indexes.get(key)
+    if index is None:
+        # One build at a time, so chunks are never embedded twice
+        with _index_lock:
+            index = _indexes.get_or_build(key, lambda: VectorIndex(chunk_knowledge(snapshot), embedder))
+    return index
+
+
+_fallback_embedder = HashingEmbedder()
+
+
+def retrieve_chunks(question, embedder=None, k=TOP_K, snapshot=None):
+    """Return the texts of the top-k chunks relevant to the question, best first."""
+    embedder = embedder or _fallback_embedder
+    try:
+        results = get_index(embedder, snapshot).search(question, k)
+    except Exception:
+        if embedder is _fallback_embedder:
+            raise
+        results = get_index(_fallback_embedder, snapshot).search(question, k)
+    return [chunk.text for _, chunk in results]
+
+
+def retrieve_context(question, embedder=None, k=TOP_K, snapshot=None):
+    """Return the top-k chunks relevant to the question as one context string."""
+    return "\n\n".join(retrieve_chunks(question, embedder, k, snapshot))
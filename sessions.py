@@ -0,0 +1,112 @@
+"""Bounded per-session chat history and idle-session expiry.
+
+Each visitor's chat history is capped by turns and bytes (audio lives in
+the shared AudioStore and messages only carry its id). Sessions report
+their footprint to a process-wide registry on every rerun; sessions that
+stay idle past a timeout have their history lists emptied in place and
+their background jobs cancelled, so memory tracks active visitors rather
+than everyone who ever opened the page.
+"""
+import sys
+import threading
+import time
+
+from shared import process_wide
+
+MAX_TURNS = 20  # question/answer pairs kept per widget
+MAX_BYTES = 64 * 1024
+IDLE_SECONDS = 30 * 60
+SWEEP_INTERVAL = 60
+MESSAGE_OVERHEAD_BYTES = 64
+
+
+def message_bytes(msg):
+    """Approximate size of a chat message's text fields."""
+    size = MESSAGE_OVERHEAD_BYTES
+    for value in msg.values():
+        if isinstance(value, str):
+            size += len(value.encode("utf-8"))
+        elif isinstance(value, (bytes, bytearray)):
+            size += len(value)
+    return size
+
+
+def bound_history(messages, max_turns=MAX_TURNS, max_bytes=MAX_BYTES):
+    """Drop the oldest messages in place until both limits hold; returns how many were dropped."""
+    dropped = 0
+    total = sum(message_bytes(m) for m in messages)
+    while len(messages) > 1 and (len(messages) > 2 * max_turns or total > max_bytes):
+        total -= message_bytes(messages.pop(0))
+        dropped += 1
+    # Keep the window starting at a question
+    while dropped and len(messages) > 1 and messages[0].get("role") != "user":
+        messages.pop(0)
+        dropped += 1
+    return dropped
+
+
+def deep_sizeof(obj, _seen=None):
+    """Rough recursive sys.getsizeof over containers (shared objects counted once)."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+class SessionRegistry:
+    """Tracks last activity and state size per session; expires idle ones."""
+
+    def __init__(self, idle_seconds=IDLE_SECONDS, on_expire=None):
+        self.idle_seconds = idle_seconds
+        self.on_expire = on_expire
+        self.stats = {"expired": 0, "trimmed_messages": 0}
+        self._sessions = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def touch(self, session_id, state_bytes, histories=()):
+        """Record activity; ``histories`` are the session's message lists, emptied on expiry."""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = {"last_seen": now, "bytes": state_bytes, "histories": list(histories)}
+        if now - self._last_sweep >= SWEEP_INTERVAL:
+            self.sweep()
+
+    def trimmed(self, count):
+        with self._lock:
+            self.stats["trimmed_messages"] += count
+
+    def sweep(self):
+        """Expire sessions idle longer than idle_seconds; returns their ids."""
+        now = time.monotonic()
+        with self._lock:
+            self._last_sweep = now
+            expired = [sid for sid, s in self._sessions.items() if now - s["last_seen"] > self.idle_seconds]
+            entries = [self._sessions.pop(sid) for sid in expired]
+            self.stats["expired"] += len(expired)
+        for sid, entry in zip(expired, entries):
+            for history in entry["histories"]:
+                history.clear()
+            if self.on_expire:
+                self.on_expire(sid)
+        return expired
+
+    def snapshot(self):
+        with self._lock:
+            sizes = [s["bytes"] for s in self._sessions.values()]
+            info = dict(self.stats)
+        info["sessions"] = len(sizes)
+        info["state_bytes"] = sum(sizes)
+        info["largest_session_bytes"] = max(sizes, default=0)
+        return info
+
+
+def get_session_registry(idle_seconds=IDLE_SECONDS, on_expire=None):
+    """Return the process-wide SessionRegistry, creating it on first use."""
+    return process_wide("session_registry", SessionRegistry, idle_seconds, on_expire)
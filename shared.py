@@ -0,0 +1,39 @@
+"""Helpers shared by the process-wide caches and services.
+
+Streamlit reruns the script for every interaction, so pools, registries,
+clients and caches are created once per process with ``process_wide``.
+Each is keyed by the arguments it was built with: the same arguments
+return the same object, and different ones build another instead of
+being ignored after the first call.
+
+Cached values built from files (knowledge, tenants, encoded assets, the
+FAQ artifact) are keyed by ``file_stamp``, so an edit to a file is picked
+up on the next lookup without re-reading unchanged ones.
+"""
+import os
+import threading
+
+_instances = {}
+# Reentrant: a service built here may look up the pools and caches it uses
+_instances_lock = threading.RLock()
+
+
+def process_wide(name, build, *args):
+    """The object ``build(*args)`` for this name and arguments, built on first use."""
+    key = (name,) + args
+    instance = _instances.get(key)
+    if instance is None:
+        with _instances_lock:
+            instance = _instances.get(key)
+            if instance is None:
+                instance = _instances[key] = build(*args)
+    return instance
+
+
+def file_stamp(path):
+    """(mtime, size) of a file, or None if it does not exist."""
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return None
+    return (st_.st_mtime_ns, st_.st_size)
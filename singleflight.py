@@ -0,0 +1,123 @@
+"""Single-flight coalescing of identical in-flight calls.
+
+When several sessions ask for the same thing at the same moment (the same
+prompt, the same sentence of speech), only the first caller hits the
+provider; the others wait for and share its result. Streams are shared
+token by token, and if the first caller stops reading, the stream is
+still drained for the callers that joined it.
+"""
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.tokens = []
+        self.done = False
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+    def publish(self, token):
+        with self.cond:
+            self.tokens.append(token)
+            self.cond.notify_all()
+
+    def finish(self, result=None, error=None):
+        with self.cond:
+            self.result = result
+            self.error = error
+            self.done = True
+            self.cond.notify_all()
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key."""
+
+    def __init__(self):
+        self.stats = {"leaders": 0, "coalesced": 0}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.stats["leaders"] += 1
+                return flight, True
+            flight.followers += 1
+            self.stats["coalesced"] += 1
+            return flight, False
+
+    def _leave(self, key, flight):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key, fn):
+        """Return fn(), or the result of an identical call already in flight."""
+        flight, leader = self._join(key)
+        if not leader:
+            with flight.cond:
+                flight.cond.wait_for(lambda: flight.done)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        try:
+            result = fn()
+        except Exception as e:
+            self._leave(key, flight)
+            flight.finish(error=e)
+            raise
+        self._leave(key, flight)
+        flight.finish(result=result)
+        return result
+
+    def stream(self, key, factory):
+        """Iterate factory(), sharing the items with concurrent callers of the same key."""
+        flight, leader = self._join(key)
+        if not leader:
+            yield from self._follow(flight)
+            return
+        source = factory()
+        complete = False
+        error = None
+        try:
+            for item in source:
+                flight.publish(item)
+                yield item
+            complete = True
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Stop taking new followers before the last items are published
+            self._leave(key, flight)
+            if not complete and flight.followers:
+                # The leader stopped reading (e.g. cancelled); finish for the others
+                try:
+                    for item in source:
+                        flight.publish(item)
+                except Exception:
+                    pass
+            flight.finish(error=error)
+
+    def _follow(self, flight):
+        i = 0
+        while True:
+            with flight.cond:
+                flight.cond.wait_for(lambda: i < len(flight.tokens) or flight.done)
+                items = flight.tokens[i:]
+                done = flight.done
+            for item in items:
+                yield item
+            i += len(items)
+            if done and i >= len(flight.tokens):
+                if flight.error is not None:
+                    raise flight.error
+                return
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._flights))
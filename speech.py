@@ -0,0 +1,321 @@
+"""Text-to-speech helpers and the sentence-level TTS pipeline.
+
+Instead of waiting for the whole answer and synthesizing it in one
+request, the answer is split into sentences as it streams in and each
+sentence is synthesized on a bounded worker pool. Segments are handed
+back in order as soon as they are ready, so speech can start while the
+rest of the answer is still being generated.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from shared import process_wide
+
+ELEVEN_BASE_URL = "https://api.elevenlabs.io"
+ELEVEN_MODEL = "eleven_monolingual_v1"
+VOICE_SETTINGS = {"stability": 0.7, "similarity_boost": 0.8}
+TTS_WORKERS = 3
+TTS_CACHE_DIR = ".cache/tts"
+TTS_CACHE_MAX_BYTES = 200 * 1024 * 1024
+MIN_SENTENCE_CHARS = 20
+
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*(\s+)")
+
+
+class TtsError(Exception):
+    """Raised when the TTS provider does not return usable audio."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def elevenlabs_tts(text, api_key, voice_id, model=ELEVEN_MODEL, voice_settings=None,
+                   base_url=ELEVEN_BASE_URL, timeout=30, session=None):
+    """Synthesize text with ElevenLabs and return the audio bytes."""
+    url = f"{base_url}/v1/text-to-speech/{voice_id}"
+    headers = {"xi-api-key": api_key, "Content-Type": "application/json"}
+    body = {"text": text, "model": model, "voice_settings": voice_settings or VOICE_SETTINGS}
+    if session is None:
+        import requests
+        session = requests
+    r = session.post(url, json=body, headers=headers, timeout=timeout)
+    if r.status_code != 200:
+        raise TtsError(f"TTS Error: {r.status_code} {r.text}", status_code=r.status_code)
+    # Check if response is valid audio
+    if not r.content or len(r.content) <= 1000:
+        raise TtsError(
+            f"TTS API returned success but no valid audio data "
+            f"(length={len(r.content)}; Content-Type={r.headers.get('Content-Type')})"
+        )
+    return r.content
+
+
+def estimate_mp3_duration(audio_bytes, bitrate=128_000):
+    """Rough playback length of a constant-bitrate MP3 in seconds."""
+    return len(audio_bytes) * 8 / bitrate
+
+
+# ---------- Audio cache ----------
+def tts_cache_key(text, voice_id, model=ELEVEN_MODEL, voice_settings=None):
+    """Content address of a synthesized clip."""
+    payload = json.dumps([text, voice_id, model, voice_settings or VOICE_SETTINGS], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """On-disk audio clips keyed by content hash, LRU-evicted above max_bytes."""
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()  # key -> size, least recently used first
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for name in os.listdir(directory):
+            if name.endswith(".mp3"):
+                st_ = os.stat(os.path.join(directory, name))
+                files.append((st_.st_mtime, name[:-4], st_.st_size))
+        for _, key, size in sorted(files):
+            self._sizes[key] = size
+            self._total += size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._sizes:
+                self.stats["misses"] += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                self._total -= self._sizes.pop(key)
+                self.stats["misses"] += 1
+                return None
+            self._sizes.move_to_end(key)
+            self.stats["hits"] += 1
+            return audio
+
+    def set(self, key, audio):
+        with self._lock:
+            tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, self._path(key))
+            self._total -= self._sizes.pop(key, 0)
+            self._sizes[key] = len(audio)
+            self._total += len(audio)
+            self.stats["sets"] += 1
+            while self._total > self.max_bytes and len(self._sizes) > 1:
+                old, size = self._sizes.popitem(last=False)
+                self._total -= size
+                self.stats["evictions"] += 1
+                try:
+                    os.remove(self._path(old))
+                except OSError:
+                    pass
+
+    def fetch(self, text, voice_id, synthesize, model=ELEVEN_MODEL, voice_settings=None):
+        """Return cached audio for text, synthesizing and storing it on a miss."""
+        key = tts_cache_key(text, voice_id, model, voice_settings)
+        audio = self.get(key)
+        if audio is None:
+            audio = synthesize(text)
+            if audio:
+                self.set(key, audio)
+        return audio
+
+    def snapshot(self):
+        with self._lock:
+            info = dict(self.stats)
+            info["entries"] = len(self._sizes)
+            info["bytes"] = self._total
+        return info
+
+
+def get_audio_cache(directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+    """Return the process-wide AudioCache, creating it on first use."""
+    return process_wide("tts_audio_cache", AudioCache, directory, max_bytes)
+
+
+# ---------- Sentence splitting ----------
+class SentenceSplitter:
+    """Accumulates streamed text and emits complete sentences.
+
+    Very short sentences are merged with the next one so each TTS request
+    carries enough text to sound natural.
+    """
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        self._buffer += text
+        sentences = []
+        while True:
+            match = None
+            for m in _SENTENCE_END_RE.finditer(self._buffer):
+                if m.start(1) >= self.min_chars:
+                    match = m
+                    break
+            if match is None:
+                return sentences
+            sentences.append(self._buffer[:match.start(1)].strip())
+            self._buffer = self._buffer[match.end(1):]
+
+    def flush(self):
+        rest, self._buffer = self._buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def split_sentences(text, min_chars=MIN_SENTENCE_CHARS):
+    splitter = SentenceSplitter(min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+# ---------- Pipeline ----------
+def get_tts_executor(max_workers=TTS_WORKERS):
+    """Process-wide worker pool, so TTS concurrency is bounded across sessions."""
+    return process_wide("tts_executor", lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="tts"), max_workers)
+
+
+class TtsPipeline:
+    """Synthesizes sentences concurrently and returns audio in sentence order.
+
+    ``synthesize`` takes a sentence and returns audio bytes or None; it runs
+    on worker threads and must not touch Streamlit. Timing is recorded in
+    ``metrics`` (seconds since the pipeline was created).
+    """
+
+    def __init__(self, synthesize, executor=None, min_chars=MIN_SENTENCE_CHARS):
+        self.synthesize = synthesize
+        self.executor = executor or get_tts_executor()
+        self.splitter = SentenceSplitter(min_chars)
+        self.sentences = []
+        self.metrics = {"sentences": 0, "failed": 0, "time_to_first_audio": None, "total": None}
+        self._futures = []
+        self._next = 0
+        self._start = time.perf_counter()
+        self._closed = False
+
+    def _run(self, sentence):
+        try:
+            return self.synthesize(sentence)
+        except Exception:
+            return None
+
+    def submit(self, sentence):
+        self.sentences.append(sentence)
+        self.metrics["sentences"] += 1
+        self._futures.append(self.executor.submit(self._run, sentence))
+
+    def feed(self, text):
+        """Add streamed text; complete sentences are sent for synthesis."""
+        for sentence in self.splitter.feed(text):
+            self.submit(sentence)
+
+    def close(self):
+        """Send the trailing partial sentence; no more text will follow."""
+        for sentence in self.splitter.flush():
+            self.submit(sentence)
+        self._closed = True
+
+    def _take(self, future):
+        self._next += 1
+        audio = future.result()
+        if audio is None:
+            self.metrics["failed"] += 1
+            return None
+        if self.metrics["time_to_first_audio"] is None:
+            self.metrics["time_to_first_audio"] = time.perf_counter() - self._start
+        return audio
+
+    def ready(self):
+        """Return the in-order segments that are finished, without blocking."""
+        out = []
+        while self._next < len(self._futures) and self._futures[self._next].done():
+            audio = self._take(self._futures[self._next])
+            if audio:
+                out.append(audio)
+        self._mark_done()
+        return out
+
+    def segments(self):
+        """Yield every segment in order, waiting for each one."""
+        if not self._closed:
+            self.close()
+        while self._next < len(self._futures):
+            audio = self._take(self._futures[self._next])
+            if audio:
+                yield audio
+        self._mark_done()
+
+    def _mark_done(self):
+        if self._closed and self._next == len(self._futures) and self.metrics["total"] is None:
+            self.metrics["total"] = time.perf_counter() - self._start
+
+
+# ---------- Pre-warm ----------
+def prewarm_faq_audio(faq, synthesize, voice_id, cache):
+    """Synthesize every FAQ answer (whole and per sentence) into the cache.
+
+    Both forms are stored because the pipeline asks for sentences while the
+    blocking path asks for the full answer. Returns the number of clips
+    that had to be synthesized.
+    """
+    created = 0
+    for item in faq:
+        answer = item.get("answer", "")
+        texts = [answer] + split_sentences(answer)
+        for text in dict.fromkeys(t for t in texts if t):
+            key = tts_cache_key(text, voice_id)
+            if cache.get(key) is None:
+                cache.set(key, synthesize(text))
+                created += 1
+    return created
+
+
+def main():
+    from config import load_secrets
+    from knowledge import load_knowledge
+
+    parser = argparse.ArgumentParser(description="Pre-warm the TTS audio cache with every FAQ answer.")
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args()
+
+    secrets = load_secrets()
+    api_key, voice_id = secrets.get("ELEVEN_API_KEY"), secrets.get("ELEVEN_VOICE_ID")
+    if not api_key or not voice_id:
+        parser.error("ELEVEN_API_KEY and ELEVEN_VOICE_ID must be set (env or .streamlit/secrets.toml)")
+    cache = AudioCache(
+        args.cache_dir or secrets.get("TTS_CACHE_DIR", TTS_CACHE_DIR),
+        int(secrets.get("TTS_CACHE_MAX_MB", TTS_CACHE_MAX_BYTES // (1024 * 1024))) * 1024 * 1024,
+    )
+    base_url = secrets.get("ELEVEN_BASE_URL", ELEVEN_BASE_URL)
+    import requests
+    session = requests.Session()
+
+    def synthesize(text):
+        return elevenlabs_tts(text, api_key, voice_id, base_url=base_url, session=session)
+
+    created = prewarm_faq_audio(load_knowledge().faq, synthesize, voice_id, cache)
+    print(f"Synthesized {created} clip(s); cache: {cache.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
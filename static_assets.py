@@ -0,0 +1,61 @@
+"""Process-wide cache of binary assets (CV PDF, profile picture).
+
+Files are read and encoded once and re-read only when their mtime/size
+changes, instead of being re-read and base64-encoded on every rerun.
+Avatars are downscaled to the size they are displayed at before being
+inlined, which keeps the per-rerun HTML small. The cache is shared by
+every portfolio and bounded by size, least recently used files first.
+"""
+import base64
+import io
+
+from bounded_cache import BoundedCache
+from shared import file_stamp
+
+MAX_BYTES = 64 * 1024 * 1024
+
+# CV bytes, profile picture bytes and its inlined avatar per portfolio
+_cache = BoundedCache("static_assets", per_portfolio=4, max_bytes=MAX_BYTES, sizeof=lambda entry: len(entry[1]))
+stats = _cache.stats
+
+
+def set_max_bytes(max_bytes):
+    _cache.resize(max_bytes=max_bytes)
+
+
+def _cached(kind, path, build):
+    stamp = file_stamp(path)
+    if stamp is None:
+        return None
+    key = (kind, path)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    value = build()
+    _cache.set(key, (stamp, value))
+    return value
+
+
+def read_asset_bytes(path):
+    """File contents, or None if the file does not exist."""
+    def build():
+        with open(path, "rb") as f:
+            return f.read()
+    return _cached("bytes", path, build)
+
+
+def image_data_uri(path, size=None):
+    """data: URI for an image, optionally downscaled to fit size x size pixels."""
+    def build():
+        data = read_asset_bytes(path)
+        mime = "image/jpeg"
+        if size:
+            from PIL import Image
+            with Image.open(io.BytesIO(data)) as img:
+                img = img.convert("RGB")
+                img.thumbnail((size, size))
+                out = io.BytesIO()
+                img.save(out, format="JPEG", quality=85, optimize=True)
+                data = out.getvalue()
+        return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+    return _cached(f"uri:{size}", path, build)
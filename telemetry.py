@@ -0,0 +1,230 @@
+"""Per-stage latency spans, counters and an offline metrics export.
+
+Each chat request gets a short request id. Stages of the request (context
+retrieval, prompt build, LLM, TTS, transcription, page render) are timed
+with ``span()``, which records a latency histogram per stage, counts
+errors, and optionally writes one JSON log line per span. Metrics are
+exported in the Prometheus text format, either from a tiny local HTTP
+endpoint or as a file for node_exporter's textfile collector; nothing
+needs network access beyond localhost.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+RECENT_SAMPLES = 500  # per histogram, for the p50/p95/p99 in snapshots
+PREFIX = "portfolio"
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Histogram:
+    """Cumulative Prometheus buckets plus a window of recent samples."""
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def snapshot(self):
+        info = {"count": self.count, "sum": self.sum}
+        if self.recent:
+            import numpy as np
+            p50, p95, p99 = np.percentile(list(self.recent), [50, 95, 99])
+            info.update(p50=float(p50), p95=float(p95), p99=float(p99))
+        return info
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by name and labels."""
+
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.collectors = {}
+        self.log_path = None
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def add_collector(self, name, fn):
+        """fn() returns a flat dict of numbers, exported as gauges ``<name>_<key>``."""
+        self.collectors[name] = fn
+
+    def log(self, record):
+        """Append one JSON line to log_path, if span logging is enabled."""
+        if not self.log_path:
+            return
+        line = json.dumps(record, default=str)
+        with self._log_lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def _collected(self):
+        gauges = {}
+        for name, fn in list(self.collectors.items()):
+            try:
+                values = fn()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{name}_{key}"] = value
+        return gauges
+
+    def snapshot(self):
+        """JSON-friendly view: counters, per-histogram percentiles and collected gauges."""
+        with self._lock:
+            counters = {f"{n}{_label_text(l)}": v for (n, l), v in self.counters.items()}
+            histograms = {f"{n}{_label_text(l)}": h.snapshot() for (n, l), h in self.histograms.items()}
+        return {"counters": counters, "histograms": histograms, "gauges": self._collected()}
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            hist_data = [(key, list(h.counts), h.count, h.sum) for key, h in histograms]
+        typed = set()
+        for (name, labels), value in counters:
+            full = f"{PREFIX}_{name}"
+            if full not in typed:
+                lines.append(f"# TYPE {full} counter")
+                typed.add(full)
+            lines.append(f"{full}{_label_text(labels)} {value}")
+        for (name, labels), counts, count, total in hist_data:
+            full = f"{PREFIX}_{name}"
+            if full not in typed:
+                lines.append(f"# TYPE {full} histogram")
+                typed.add(full)
+            for bound, bucket_count in zip(BUCKETS, counts):
+                lines.append(f"{full}_bucket{_label_text(labels + (('le', bound),))} {bucket_count}")
+            lines.append(f"{full}_bucket{_label_text(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{full}_sum{_label_text(labels)} {total}")
+            lines.append(f"{full}_count{_label_text(labels)} {count}")
+        for name, value in sorted(self._collected().items()):
+            full = f"{PREFIX}_{name}"
+            lines.append(f"# TYPE {full} gauge")
+            lines.append(f"{full} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write the exposition atomically, for node_exporter's textfile collector."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+
+metrics = Metrics()
+
+
+def record(stage, seconds, request_id=None, error=None, **fields):
+    """Record a stage duration measured elsewhere (same effect as a span)."""
+    metrics.observe("stage_seconds", seconds, stage=stage)
+    if metrics.log_path:
+        metrics.log(dict(fields, ts=time.time(), request_id=request_id, stage=stage,
+                         seconds=round(seconds, 6), error=error))
+
+
+@contextmanager
+def span(stage, request_id=None, **fields):
+    """Time one stage; records ``stage_seconds{stage}`` and counts errors.
+
+    Yields a dict that the caller may add fields to for the log line.
+    """
+    extra = dict(fields)
+    start = time.perf_counter()
+    error = None
+    try:
+        yield extra
+    except Exception as e:
+        error = type(e).__name__
+        metrics.inc("errors_total", stage=stage)
+        raise
+    finally:
+        record(stage, time.perf_counter() - start, request_id, error, **extra)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------- HTTP endpoint ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics.json":
+            body, content_type = json.dumps(metrics.snapshot()).encode("utf-8"), "application/json"
+        elif self.path.split("?")[0] == "/metrics":
+            body, content_type = metrics.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def serve_metrics(port, host="127.0.0.1"):
+    """Start the /metrics and /metrics.json endpoint once per process."""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                server = ThreadingHTTPServer((host, port), _MetricsHandler)
+                threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+                _server = server
+    return _server
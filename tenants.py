@@ -0,0 +1,124 @@
+"""Portfolios (tenants) served by one app process.
+
+The built-in portfolio uses the files in ``assets/``. Every other
+portfolio is a directory ``tenants/<id>/`` with the same kinds of files
+and an optional ``tenant.json``::
+
+    tenants/alice/
+        tenant.json     {"name": "Alice Smith", "voice_id": "...", "about": "...",
+                         "certifications": [["Course", "Issuer"]], "interests": [...],
+                         "skills": [...], "contacts": [["Email", "alice@example.com", null]],
+                         "chat_prompt": "...", "assistant_prompt": "..."}
+        cv.pdf  cv.txt  projects.json  faq.json  profile.jpg
+
+A visit picks its portfolio with ``?tenant=<id>``, falling back to the
+configured default. Portfolios are loaded on first visit, and everything
+built from their files (knowledge base, indexes, encoded images and PDF,
+rendered fragments) lives in the shared bounded caches, so memory
+follows the portfolios that are being visited rather than the number
+hosted.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass, field
+
+from assistant import ASSISTANT_PROMPT_TEMPLATE, CHAT_PROMPT_TEMPLATE
+from bounded_cache import BoundedCache
+from knowledge import CV_TEXT_FILE, FAQ_FILE, PROJECTS_FILE, load_knowledge
+from shared import file_stamp
+
+BUILTIN_TENANT = "default"
+TENANTS_DIR = "tenants"
+TENANT_FILE = "tenant.json"
+
+_ID_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    id: str
+    name: str
+    cv_pdf: str
+    cv_text: str
+    projects_file: str
+    faq_file: str
+    profile_image: str
+    chat_prompt: str
+    assistant_prompt: str
+    voice_id: str = None
+    profile: dict = field(default=None, compare=False)  # None: the About content in pages.py
+
+    @property
+    def first_name(self):
+        return self.name.split()[0]
+
+    @property
+    def knowledge_paths(self):
+        return (self.cv_text, self.projects_file, self.faq_file)
+
+    def knowledge(self):
+        """Current snapshot of this portfolio's shared knowledge base."""
+        return load_knowledge(self.knowledge_paths)
+
+    def faq_artifact_dir(self, base):
+        """Where faq_precompute.py writes this portfolio's artifact."""
+        return base if self.id == BUILTIN_TENANT else os.path.join(base, TENANTS_DIR, self.id)
+
+
+BUILTIN = Tenant(
+    id=BUILTIN_TENANT,
+    name="Claire Namusoke",
+    cv_pdf="assets/@claire.cv.pdf",
+    cv_text=CV_TEXT_FILE,
+    projects_file=PROJECTS_FILE,
+    faq_file=FAQ_FILE,
+    profile_image="assets/profile.jpg",
+    chat_prompt=CHAT_PROMPT_TEMPLATE.format(name="Claire"),
+    assistant_prompt=ASSISTANT_PROMPT_TEMPLATE.format(name="Claire Namusoke"),
+)
+
+
+def _load_tenant(tenant_id, directory):
+    config = {}
+    path = os.path.join(directory, TENANT_FILE)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    name = config.get("name") or tenant_id
+    profile = {key: config[key] for key in ("about", "certifications", "interests", "skills", "contacts") if key in config}
+    return Tenant(
+        id=tenant_id,
+        name=name,
+        cv_pdf=os.path.join(directory, "cv.pdf"),
+        cv_text=os.path.join(directory, "cv.txt"),
+        projects_file=os.path.join(directory, "projects.json"),
+        faq_file=os.path.join(directory, "faq.json"),
+        profile_image=os.path.join(directory, "profile.jpg"),
+        chat_prompt=config.get("chat_prompt") or CHAT_PROMPT_TEMPLATE.format(name=name.split()[0]),
+        assistant_prompt=config.get("assistant_prompt") or ASSISTANT_PROMPT_TEMPLATE.format(name=name),
+        voice_id=config.get("voice_id"),
+        profile=profile,
+    )
+
+
+_tenants = BoundedCache("tenants")
+
+
+def get_tenant(tenant_id, tenants_dir=TENANTS_DIR):
+    """The portfolio with this id, or None if there is no such portfolio."""
+    if tenant_id == BUILTIN_TENANT:
+        return BUILTIN
+    if not tenant_id or not _ID_RE.match(tenant_id):
+        return None
+    directory = os.path.join(tenants_dir, tenant_id)
+    if not os.path.isdir(directory):
+        return None
+    # Reloaded when tenant.json is edited
+    key = (directory, file_stamp(os.path.join(directory, TENANT_FILE)))
+    return _tenants.get_or_build(key, lambda: _load_tenant(tenant_id, directory))
+
+
+def resolve_tenant(requested=None, default=BUILTIN_TENANT, tenants_dir=TENANTS_DIR):
+    """The requested portfolio if it exists, else the configured default (else the built-in one)."""
+    return get_tenant(requested, tenants_dir) or get_tenant(default, tenants_dir) or BUILTIN
@@ -0,0 +1,34 @@
+import bounded_cache
+from bounded_cache import BoundedCache, configure_caches
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = BoundedCache("test_lru")
+    cache.resize(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_byte_limit_keeps_the_newest_entry():
+    cache = BoundedCache("test_bytes", max_bytes=10, sizeof=len)
+    cache.set("a", b"123456")
+    cache.set("b", b"123456")
+    assert cache.get("a") is None
+    cache.set("c", b"x" * 50)
+    assert cache.get("c") == b"x" * 50
+    assert cache.snapshot()["bytes"] == 50
+
+
+def test_configure_caches_sizes_caches_created_later():
+    earlier = BoundedCache("test_earlier", per_portfolio=2)
+    configure_caches(3)
+    try:
+        later = BoundedCache("test_later", per_portfolio=2)
+        assert (earlier.max_entries, later.max_entries) == (6, 6)
+    finally:
+        configure_caches(bounded_cache.MAX_PORTFOLIOS)
@@ -0,0 +1,40 @@
+from faq_match import FaqMatcher, normalize
+
+FAQ = [
+    {"question": "What programming languages do you use?", "answer": "Python and SQL."},
+    {"question": "Where do you study?", "answer": "Hochschule Bremen."},
+    {"question": "Are you open to internships?", "answer": "Yes."},
+    {"question": "", "answer": "Skipped: no question."},
+]
+
+
+def test_normalize_drops_case_punctuation_and_apostrophes():
+    assert normalize("  What's YOUR   favourite tool?! ") == "whats your favourite tool"
+
+
+def test_exact_question_matches_after_normalizing():
+    match = FaqMatcher(FAQ).match("where do you study")
+    assert (match.answer, match.score) == ("Hochschule Bremen.", 1.0)
+
+
+def test_rephrasing_and_typos_still_match():
+    matcher = FaqMatcher(FAQ)
+    assert matcher.match("Which programming languages do you use?").answer == "Python and SQL."
+    assert matcher.match("What programing langauges do you use").answer == "Python and SQL."
+
+
+def test_swapping_one_content_word_is_not_a_match():
+    matcher = FaqMatcher(FAQ)
+    assert matcher.match("What cooking languages do you use?") is None
+    assert matcher.match("Are you not open to internships?") is None
+    assert matcher.match("Where do you work?") is None
+
+
+def test_unrelated_and_empty_questions_do_not_match():
+    matcher = FaqMatcher(FAQ)
+    assert matcher.match("How big is a container ship?") is None
+    assert matcher.match("?!") is None
+
+
+def test_entries_without_question_or_answer_are_skipped():
+    assert len(FaqMatcher(FAQ).entries) == 3
@@ -0,0 +1,65 @@
+import os
+
+from assistant import TEXT_AND_SPEECH, AssistantService, AssistantSettings, ReplyStream
+from faq_precompute import PrecomputedFaq, _parse_list, build_artifact, load_artifact
+from knowledge import load_knowledge
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FAQ = [
+    {"question": "Where do you study?", "answer": "Hochschule Bremen."},
+    {"question": "Are you open to internships?", "answer": "Yes."},
+]
+
+
+def build(directory, voice_id, log=None):
+    return build_artifact(FAQ, str(directory), synthesize=lambda text: f"mp3:{voice_id}:{text}".encode(),
+                          voice_id=voice_id, log=log or (lambda message: None))
+
+
+def test_audio_is_served_only_for_the_voice_it_was_built_with(tmp_path):
+    build(tmp_path, "voice-a")
+    precomputed = PrecomputedFaq(load_artifact(str(tmp_path)), FAQ, str(tmp_path))
+    entry, _ = precomputed.match("Where do you study?")
+    assert precomputed.audio(entry, "voice-a") == b"mp3:voice-a:Hochschule Bremen."
+    assert precomputed.audio(entry, "voice-b") is None
+
+
+def test_changing_the_voice_rebuilds_every_entry(tmp_path):
+    assert build(tmp_path, "voice-a")["built"] == 2
+    assert build(tmp_path, "voice-a")["reused"] == 2
+    report = build(tmp_path, "voice-b")
+    assert (report["built"], report["reused"]) == (2, 0)
+    assert load_artifact(str(tmp_path))["voice"] == "voice-b"
+
+
+def test_entries_edited_since_the_build_are_not_served(tmp_path):
+    build(tmp_path, "voice-a")
+    edited = [FAQ[0], {"question": "Are you open to internships?", "answer": "From March."}]
+    precomputed = PrecomputedFaq(load_artifact(str(tmp_path)), edited, str(tmp_path))
+    assert precomputed.match("Where do you study?") is not None
+    assert precomputed.match("Are you open to internships?") is None
+
+
+def test_paraphrases_are_read_from_json_or_a_list():
+    assert _parse_list('["Where do you study?", "Which university?"]') == ["Where do you study?", "Which university?"]
+    assert _parse_list("1. Which university?\n- Where do you study?\n2) What is your 2nd degree?") == [
+        "Which university?", "Where do you study?", "What is your 2nd degree?",
+    ]
+    # Numbers and periods inside or at the end of a question are kept
+    assert _parse_list("1. Do you know Python 3.\n2. Since 2021.") == ["Do you know Python 3.", "Since 2021."]
+
+
+def test_a_clip_in_an_old_voice_is_spoken_live(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    faq = load_knowledge().faq
+    build_artifact(faq, str(tmp_path / "faq"), synthesize=lambda text: b"old voice", voice_id="voice-a",
+                   log=lambda message: None)
+    settings = AssistantSettings(eleven_api_key="key", eleven_voice_id="voice-b", faq_artifact_dir=str(tmp_path / "faq"),
+                                 tts_cache_dir=str(tmp_path / "tts"), stream_responses=False)
+    service = AssistantService(settings)
+    monkeypatch.setattr(service, "synthesize", lambda text, request_id=None, voice_id=None: b"new voice")
+    out = ReplyStream()
+    result = service.answer(faq[0]["question"], TEXT_AND_SPEECH, out=out)
+    assert result["source"] == "faq_precomputed"
+    assert out.segments and b"old voice" not in out.segments
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from jobs import JobManager
+
+
+def test_cancelling_a_queued_job_is_counted():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    running = manager.submit("s", "chat", lambda job: release.wait(5))
+    queued = manager.submit("s", "chat", lambda job: "never")
+    manager.cancel(queued)
+    release.set()
+    running.future.result(5)
+    assert queued.status == "cancelled"
+    assert manager.snapshot()["cancelled"] == 1
+
+
+def test_cancelling_a_running_job_is_counted_once_it_stops():
+    manager = JobManager(max_workers=1)
+    started = threading.Event()
+
+    def work(job):
+        started.set()
+        for _ in range(500):
+            if job.cancelled:
+                return "stopped"
+            time.sleep(0.01)
+
+    job = manager.submit("s", "chat", work)
+    started.wait(5)
+    manager.cancel(job)
+    job.future.result(5)
+    assert job.status == "cancelled"
+    assert manager.snapshot()["cancelled"] == 1
+
+
+def test_cancel_session_only_touches_that_sessions_jobs():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    blocker = manager.submit("other", "chat", lambda job: release.wait(5))
+    mine = manager.submit("mine", "chat", lambda job: "never")
+    theirs = manager.submit("other", "chat", lambda job: "answer")
+    assert manager.cancel_session("mine") == 1
+    release.set()
+    blocker.future.result(5)
+    theirs.future.result(5)
+    assert (mine.status, theirs.status) == ("cancelled", "done")
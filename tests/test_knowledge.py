@@ -0,0 +1,53 @@
+import json
+import os
+
+from knowledge import KnowledgeBase
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def make_assets(tmp_path, projects=None, faq=None):
+    paths = [str(tmp_path / name) for name in ("cv.txt", "projects.json", "faq.json")]
+    write(paths[0], "Analyst with shipping experience.")
+    write(paths[1], json.dumps(projects or [{"title": "Fleet", "description": "Fleet dashboard", "tools": ["SQL"]}]))
+    write(paths[2], json.dumps(faq or [{"question": "Who are you?", "answer": "An analyst."}]))
+    return paths
+
+
+def test_assets_are_read_once_while_unchanged(tmp_path):
+    kb = KnowledgeBase(*make_assets(tmp_path))
+    first = kb.get()
+    assert kb.get() is first
+    assert kb.stats == {"hits": 1, "misses": 1, "reloads": 1}
+    assert first.projects[0]["title"] == "Fleet"
+
+
+def test_changed_file_gives_a_new_version(tmp_path):
+    paths = make_assets(tmp_path)
+    kb = KnowledgeBase(*paths)
+    first = kb.get()
+    write(paths[0], "Analyst with chartering experience too.")
+    second = kb.get()
+    assert second.version != first.version
+    assert second.cv_text.endswith("too.")
+
+
+def test_touched_but_identical_files_keep_the_snapshot(tmp_path):
+    paths = make_assets(tmp_path)
+    kb = KnowledgeBase(*paths)
+    first = kb.get()
+    stat = os.stat(paths[1])
+    os.utime(paths[1], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert kb.get() is first
+    assert kb.stats["reloads"] == 1
+
+
+def test_missing_files_and_fields_load_as_empty(tmp_path):
+    paths = make_assets(tmp_path, projects=[{"title": "No description yet"}])
+    os.remove(paths[2])
+    snapshot = KnowledgeBase(*paths).get()
+    assert snapshot.projects == [{"title": "No description yet"}]
+    assert snapshot.faq == []
@@ -0,0 +1,99 @@
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+import pytest
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+from assistant import AssistantService
+from audio_store import get_audio_store
+from jobs import get_job_manager
+from sessions import get_session_registry
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "portfolio.py")
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    return AppTest.from_file(APP, default_timeout=30).run()
+
+
+@contextmanager
+def chat_widget_reruns(at):
+    """Run the next interactions as the browser does for widgets in the chat fragment: that fragment only."""
+    storage = at._fragment_storage
+    widget = [fid for fid in storage._fragments if storage._parent_by_id.get(fid) is None]
+    rerun = functools.partial(RerunData, fragment_id_queue=widget, is_fragment_scoped_rerun=True)
+    with mock.patch.object(local_script_runner, "RerunData", rerun):
+        yield
+
+
+def app_sessions():
+    """The registry portfolio.py sets up without secrets (SESSION_IDLE_MINUTES=30, JOB_WORKERS=8)."""
+    return get_session_registry(30 * 60, get_job_manager(8).cancel_session)
+
+
+def test_a_session_that_only_chats_is_not_swept(app, monkeypatch):
+    registry = app_sessions()
+    assert app.session_state.session_id in registry._sessions
+    release = threading.Event()
+    # Still answering, so the chat rerun does not end in a full app rerun
+    monkeypatch.setattr(AssistantService, "run_job", lambda self, job, *args: release.wait(5) and None)
+    monkeypatch.setattr(registry, "idle_seconds", 0.5)
+    time.sleep(0.6)
+    try:
+        with chat_widget_reruns(app):
+            app.text_input(key="chat_input").input("Talk about your first project?").run()
+        assert not app.exception
+        assert app.session_state.session_id not in registry.sweep()
+        assert app.session_state.chat_messages[0]["content"] == "Talk about your first project?"
+    finally:
+        release.set()
+
+
+def polling_fragments(at):
+    storage = at._fragment_storage
+    return [fid for fid in storage._fragments if storage._parent_by_id.get(fid) is not None]
+
+
+def test_chat_job_is_polled_only_while_in_flight(app, monkeypatch):
+    release = threading.Event()
+
+    def answer(self, job, question, *args):
+        release.wait(5)
+        return {"question": question, "answer": "Shipping data.", "source": "test"}
+
+    monkeypatch.setattr(AssistantService, "run_job", answer)
+    assert polling_fragments(app) == []
+    app.text_input(key="chat_input").input("What do you work on?").run()
+    assert len(polling_fragments(app)) == 1
+    release.set()
+    for _ in range(50):
+        if "chat_job_id" not in app.session_state:
+            break
+        time.sleep(0.1)
+        app.run()
+    assert not app.exception
+    assert polling_fragments(app) == []
+    assert app.session_state.chat_messages[-1]["content"] == "Shipping data."
+
+
+def test_a_replayed_clip_stays_mounted_across_reruns(app):
+    audio_id = get_audio_store().put(b"ID3" + b"\x00" * 64)
+    app.session_state["chat_messages"] = [
+        {"role": "user", "content": "Hello?"},
+        {"role": "assistant", "content": "Hi!", "audio_id": audio_id, "played": True},
+    ]
+    app.run()
+    assert len(app.get("audio")) == 0
+    app.button(key="play_text_1").click().run()
+    assert len(app.get("audio")) == 1
+    app.run()
+    assert len(app.get("audio")) == 1
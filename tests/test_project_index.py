@@ -0,0 +1,37 @@
+from project_index import ProjectIndex, paginate
+
+PROJECTS = [
+    {"title": "Shipping Dashboard", "description": "Container volumes in Power BI.", "tools": ["Power BI", "SQL"]},
+    {"title": "Churn Model", "description": "Predicting churn with Python.", "tools": ["Python", "sql"]},
+    {"title": "Port Traffic", "description": "Shipping routes mapped in Python.", "tools": ["Python"]},
+    {"title": "Untitled"},
+]
+
+
+def test_every_query_word_matches_by_prefix():
+    index = ProjectIndex(PROJECTS)
+    assert index.search("ship") == [0, 2]
+    assert index.search("ship pyth") == [2]
+    assert index.search("SHIPPING!") == [0, 2]
+    assert index.search("shipx") == []
+
+
+def test_tool_filters_are_case_insensitive_and_combine_with_search():
+    index = ProjectIndex(PROJECTS)
+    assert index.search(tools=["sql"]) == [0, 1]
+    assert index.search("churn", tools=["SQL", "Python"]) == [1]
+    assert index.search(tools=["Excel"]) == []
+
+
+def test_no_query_lists_every_project_and_tools_are_most_used_first():
+    index = ProjectIndex(PROJECTS)
+    assert index.search() == [0, 1, 2, 3]
+    assert index.tools == ["Python", "SQL", "Power BI"]
+
+
+def test_paginate_clamps_the_page():
+    ids = list(range(25))
+    assert paginate(ids, 2) == (list(range(10, 20)), 2, 3)
+    assert paginate(ids, 9) == (list(range(20, 25)), 3, 3)
+    assert paginate(ids, 0) == (list(range(10)), 1, 3)
+    assert paginate([], 4) == ([], 1, 1)
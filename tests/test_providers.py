@@ -0,0 +1,115 @@
+import time
+
+import pytest
+
+import providers
+from providers import (
+    CircuitBreaker,
+    ProviderBusy,
+    TokenBucket,
+    call_with_retries,
+    configure_provider_limits,
+    provider_admission,
+)
+
+
+@pytest.fixture
+def queue_timeout(monkeypatch):
+    monkeypatch.setattr(providers, "_queue_timeout", 0.1)
+    return 0.1
+
+
+def test_bucket_allows_the_burst_then_waits():
+    bucket = TokenBucket(rate=10.0, burst=2)
+    assert bucket.reserve(0) == 0.0
+    assert bucket.reserve(0) == 0.0
+    wait = bucket.reserve(1)
+    assert 0.05 < wait <= 0.1
+
+
+def test_bucket_refuses_past_the_timeout_without_taking_a_token():
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.reserve(0) == 0.0
+    assert bucket.reserve(0.5) is None
+    # The refusal did not consume anything: the next token is still ~1s away
+    assert 0.9 < bucket.reserve(2) <= 1.0
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_breaker_lets_one_trial_through_and_reopens_if_it_fails():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Other calls fail fast while the trial is in flight
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.snapshot()["opened"] == 1
+
+
+def test_breaker_closes_after_a_successful_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_admission_is_refused_when_the_bucket_is_empty(queue_timeout):
+    configure_provider_limits({"test-rate": 4}, rates={"test-rate": (1.0, 1)})
+    with provider_admission("test-rate"):
+        pass
+    start = time.monotonic()
+    with pytest.raises(ProviderBusy):
+        with provider_admission("test-rate"):
+            pass
+    # Refused up front rather than after sleeping for the token
+    assert time.monotonic() - start < queue_timeout
+    assert providers.admission_stats()["test-rate"]["busy"] == 1
+
+
+def test_admission_is_refused_when_every_slot_is_taken_past_the_timeout(queue_timeout):
+    configure_provider_limits({"test-slots": 1}, rates={"test-slots": (100.0, 10)})
+    with provider_admission("test-slots"):
+        start = time.monotonic()
+        with pytest.raises(ProviderBusy):
+            with provider_admission("test-slots"):
+                pass
+        assert time.monotonic() - start >= queue_timeout * 0.9
+    with provider_admission("test-slots"):
+        pass
+    stats = providers.admission_stats()["test-slots"]
+    assert (stats["admitted"], stats["busy"], stats["waiting"]) == (2, 1, 0)
+
+
+def test_streamed_call_holds_its_slot_until_read_or_closed(queue_timeout):
+    configure_provider_limits({"test-stream": 1}, rates={"test-stream": (100.0, 10)})
+    stream = call_with_retries("test-stream", lambda: iter(["a", "b"]), stream=True)
+    with pytest.raises(ProviderBusy):
+        with provider_admission("test-stream"):
+            pass
+    assert list(stream) == ["a", "b"]
+    with provider_admission("test-stream"):
+        pass
+
+    stream = call_with_retries("test-stream", lambda: iter(["a", "b"]), stream=True)
+    assert next(stream) == "a"
+    stream.close()
+    with provider_admission("test-stream"):
+        pass
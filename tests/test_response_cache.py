@@ -0,0 +1,65 @@
+import pytest
+
+import response_cache
+from response_cache import ResponseCache, prompt_fingerprint
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def test_fingerprint_changes_with_the_knowledge_version():
+    args = ("gpt-4o-mini", "system", [{"role": "user", "content": "Hi"}], 0.7, 500)
+    assert prompt_fingerprint(*args, version="v1") == prompt_fingerprint(*args, version="v1")
+    assert prompt_fingerprint(*args, version="v1") != prompt_fingerprint(*args, version="v2")
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.set("k", "answer")
+    clock.now += 60
+    assert cache.get("k") == "answer"
+    clock.now += 1
+    assert cache.get("k") is None
+    assert cache.snapshot()["expired"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_restart_and_expires_too(clock, tmp_path):
+    db = str(tmp_path / "responses.sqlite")
+    ResponseCache(db_path=db, ttl=60).set("k", "answer")
+    restarted = ResponseCache(db_path=db, ttl=60)
+    assert restarted.get("k") == "answer"
+    assert restarted.snapshot()["disk_hits"] == 1
+    clock.now += 61
+    assert ResponseCache(db_path=db, ttl=60).get("k") is None
+
+
+def test_disk_tier_keeps_the_most_recently_used_entries(clock, tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "responses.sqlite"), disk_max_entries=2)
+    for i, key in enumerate("abc"):
+        clock.now += 1
+        cache.set(key, str(i))
+    assert cache.snapshot()["disk_entries"] == 2
+    cache.clear()
+    assert cache.snapshot()["disk_entries"] == 0
@@ -0,0 +1,55 @@
+import pytest
+
+from knowledge import KnowledgeSnapshot
+from providers import ProviderUnavailable
+from retrieval import HashingEmbedder, OpenAIEmbedder, VectorIndex, chunk_knowledge, retrieve_chunks
+
+SNAPSHOT = KnowledgeSnapshot(
+    version="retrieval-test",
+    cv_text="Studied international shipping and chartering in Bremen.\n\nBuilt Power BI dashboards for freight rates.",
+    projects=[
+        {"title": "Emissions tracker", "description": "Estimates CO2 emissions per voyage.", "tools": ["Python", "SQL"]},
+        {"title": "Untitled"},
+    ],
+    faq=[{"question": "Where did you study?", "answer": "Hochschule Bremen."}],
+)
+
+
+def test_every_asset_is_chunked_with_its_source():
+    chunks = chunk_knowledge(SNAPSHOT)
+    assert [c.source for c in chunks] == ["faq", "project", "cv"]
+    assert chunks[0].text == "Q: Where did you study?\nA: Hochschule Bremen."
+    assert chunks[1].text.startswith("Project: Emissions tracker (tools: Python, SQL)\n")
+    assert "Bremen" in chunks[2].text and "Power BI" in chunks[2].text
+
+
+def test_long_text_is_split_at_word_boundaries():
+    words = " ".join(f"word{i}" for i in range(200))
+    chunks = chunk_knowledge(KnowledgeSnapshot(version="long", cv_text=words), max_chars=100)
+    assert len(chunks) > 1
+    assert all(len(c.text) <= len("CV: ") + 100 for c in chunks)
+    assert " ".join(c.text[len("CV: "):] for c in chunks) == words
+
+
+def test_search_returns_the_top_k_best_first():
+    index = VectorIndex(chunk_knowledge(SNAPSHOT), HashingEmbedder())
+    results = index.search("CO2 emissions per voyage", k=2)
+    assert len(results) == 2
+    assert results[0][1].source == "project"
+    assert results[0][0] >= results[1][0]
+    assert index.search("   ") == []
+
+
+def test_failing_remote_embedder_falls_back_to_hashing(monkeypatch):
+    def unavailable(self, texts):
+        raise ProviderUnavailable("openai is temporarily unavailable")
+
+    monkeypatch.setattr(OpenAIEmbedder, "embed", unavailable)
+    chunks = retrieve_chunks("Where did you study?", OpenAIEmbedder("key"), k=1, snapshot=SNAPSHOT)
+    assert chunks == ["Q: Where did you study?\nA: Hochschule Bremen."]
+
+
+def test_fallback_embedder_errors_are_not_swallowed(monkeypatch):
+    monkeypatch.setattr(HashingEmbedder, "embed", lambda self, texts: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        retrieve_chunks("anything", snapshot=KnowledgeSnapshot(version="broken", cv_text="text"))
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+import sessions
+from sessions import SessionRegistry, bound_history, message_bytes
+
+
+def turns(n, text="x"):
+    messages = []
+    for i in range(n):
+        messages += [{"role": "user", "content": f"q{i} {text}"}, {"role": "assistant", "content": f"a{i} {text}"}]
+    return messages
+
+
+def test_history_keeps_the_newest_turns():
+    messages = turns(5)
+    assert bound_history(messages, max_turns=2, max_bytes=10**6) == 6
+    assert [m["content"] for m in messages] == ["q3 x", "a3 x", "q4 x", "a4 x"]
+
+
+def test_history_is_trimmed_by_bytes_and_starts_at_a_question():
+    messages = turns(4, text="y" * 100)
+    limit = 3 * message_bytes(messages[0])
+    bound_history(messages, max_turns=100, max_bytes=limit)
+    assert sum(message_bytes(m) for m in messages) <= limit
+    assert messages[0]["role"] == "user"
+
+
+def test_a_single_oversized_message_is_kept():
+    messages = [{"role": "user", "content": "z" * 1000}]
+    assert bound_history(messages, max_turns=1, max_bytes=10) == 0
+    assert len(messages) == 1
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sessions, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_idle_sessions_lose_history_and_jobs(now):
+    expired = []
+    registry = SessionRegistry(idle_seconds=60, on_expire=expired.append)
+    idle_history, active_history = turns(1), turns(1)
+    registry.touch("idle", 100, [idle_history])
+    now[0] += 50
+    registry.touch("active", 100, [active_history])
+    now[0] += 20
+    assert registry.sweep() == ["idle"]
+    assert (idle_history, expired) == ([], ["idle"])
+    assert len(active_history) == 2
+    assert registry.snapshot() == {"expired": 1, "trimmed_messages": 0, "sessions": 1,
+                                   "state_bytes": 100, "largest_session_bytes": 100}
+
+
+def test_touch_sweeps_at_most_once_per_interval(now):
+    registry = SessionRegistry(idle_seconds=1)
+    registry.touch("a", 1)
+    now[0] += 5
+    registry.touch("b", 1)
+    assert registry.snapshot()["sessions"] == 2
+    now[0] += sessions.SWEEP_INTERVAL
+    registry.touch("b", 1)
+    assert registry.snapshot()["sessions"] == 1
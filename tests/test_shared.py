@@ -0,0 +1,25 @@
+from shared import file_stamp, process_wide
+from speech import get_audio_cache
+
+
+def test_process_wide_objects_are_keyed_by_their_arguments():
+    built = []
+    build = lambda size: built.append(size) or [size]
+    assert process_wide("test_pool", build, 2) is process_wide("test_pool", build, 2)
+    assert process_wide("test_pool", build, 4) == [4]
+    assert built == [2, 4]
+
+
+def test_a_second_cache_directory_is_not_ignored(tmp_path):
+    first = get_audio_cache(str(tmp_path / "a"), 1024)
+    assert get_audio_cache(str(tmp_path / "b"), 1024) is not first
+    assert get_audio_cache(str(tmp_path / "a"), 1024) is first
+
+
+def test_file_stamp_changes_with_the_file(tmp_path):
+    path = tmp_path / "faq.json"
+    assert file_stamp(str(path)) is None
+    path.write_text("[]")
+    before = file_stamp(str(path))
+    path.write_text('[{"question": "?"}]')
+    assert file_stamp(str(path)) != before
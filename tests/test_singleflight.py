@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_do_shares_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def slow():
+        calls.append(1)
+        release.wait(2)
+        return "answer"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    leader.start()
+    wait_until(lambda: calls)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+    follower.start()
+    wait_until(lambda: flight.stats["coalesced"] == 1)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+    assert flight.snapshot()["in_flight"] == 0
+
+
+def test_do_follower_gets_the_leaders_error():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        release.wait(2)
+        raise ValueError("provider down")
+
+    def call():
+        try:
+            flight.do("k", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    started.wait(2)
+    threads.append(threading.Thread(target=call))
+    threads[1].start()
+    wait_until(lambda: flight.stats["coalesced"] == 1)
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+    # A failed flight is not kept; the next call runs again
+    assert flight.do("k", lambda: "retried") == "retried"
+
+
+def test_stream_follower_gets_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def source():
+        yield "a"
+        release.wait(2)
+        raise ConnectionError("stream cut")
+
+    leader = flight.stream("k", source)
+    assert next(leader) == "a"
+    received, errors = [], []
+
+    def follow():
+        try:
+            for item in flight.stream("k", source):
+                received.append(item)
+        except ConnectionError as e:
+            errors.append(e)
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    wait_until(lambda: flight.stats["coalesced"] == 1)
+    release.set()
+    with pytest.raises(ConnectionError):
+        next(leader)
+    follower.join(2)
+    assert received == ["a"]
+    assert len(errors) == 1
+
+
+def test_stream_is_drained_for_followers_when_the_leader_stops_reading():
+    flight = SingleFlight()
+    tokens = ["one ", "two ", "three ", "four"]
+    factory_calls = []
+
+    def source():
+        factory_calls.append(1)
+        return iter(tokens)
+
+    leader = flight.stream("k", source)
+    assert next(leader) == "one "
+    received = []
+    follower = threading.Thread(target=lambda: received.extend(flight.stream("k", source)))
+    follower.start()
+    wait_until(lambda: flight.stats["coalesced"] == 1)
+    # The leader's session is cancelled mid-stream
+    leader.close()
+    follower.join(2)
+    assert not follower.is_alive()
+    assert received == tokens
+    assert len(factory_calls) == 1
+    assert flight.snapshot()["in_flight"] == 0
@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+
+from assistant import TEXT_ONLY, AssistantService, AssistantSettings
+from tenants import BUILTIN, get_tenant, resolve_tenant
+
+
+def write_tenant(root, tenant_id, config, faq, projects=()):
+    directory = root / tenant_id
+    directory.mkdir(parents=True)
+    (directory / "tenant.json").write_text(json.dumps(config))
+    (directory / "faq.json").write_text(json.dumps(faq))
+    (directory / "projects.json").write_text(json.dumps(list(projects)))
+    (directory / "cv.txt").write_text(f"CV of {config.get('name', tenant_id)}")
+    return directory
+
+
+@pytest.fixture
+def tenants_dir(tmp_path):
+    root = tmp_path / "tenants"
+    write_tenant(root, "alice", {"name": "Alice Smith", "voice_id": "voice-alice", "skills": ["SQL"]},
+                 [{"question": "Where do you work?", "answer": "At the port of Hamburg."}],
+                 [{"title": "Harbour Tracker", "tools": ["Python"]}])
+    write_tenant(root, "bob", {"name": "Bob Jones"},
+                 [{"question": "Where do you work?", "answer": "At a bakery in Bremen."}])
+    (root / "loose.txt").write_text("not a portfolio")
+    return str(root)
+
+
+def test_each_portfolio_is_loaded_from_its_own_directory(tenants_dir):
+    alice = get_tenant("alice", tenants_dir)
+    assert (alice.name, alice.first_name, alice.voice_id) == ("Alice Smith", "Alice", "voice-alice")
+    assert alice.profile == {"skills": ["SQL"]}
+    assert "Alice" in alice.chat_prompt
+    assert alice.cv_text == os.path.join(tenants_dir, "alice", "cv.txt")
+    assert get_tenant("bob", tenants_dir).voice_id is None
+
+
+@pytest.mark.parametrize("tenant_id", ["../alice", "alice/../bob", "Alice", "", None, "loose.txt", "carol"])
+def test_unknown_or_unsafe_ids_fall_back_to_the_default(tenants_dir, tenant_id):
+    assert get_tenant(tenant_id, tenants_dir) is None
+    assert resolve_tenant(tenant_id, "bob", tenants_dir).id == "bob"
+    assert resolve_tenant(tenant_id, "missing", tenants_dir) is BUILTIN
+
+
+def test_knowledge_and_faq_answers_do_not_leak_between_portfolios(tenants_dir, tmp_path):
+    alice, bob = get_tenant("alice", tenants_dir), get_tenant("bob", tenants_dir)
+    assert alice.knowledge().cv_text == "CV of Alice Smith"
+    assert [p["title"] for p in alice.knowledge().projects] == ["Harbour Tracker"]
+    assert bob.knowledge().projects == []
+    assert alice.faq_artifact_dir(".cache/faq") != bob.faq_artifact_dir(".cache/faq")
+    service = AssistantService(AssistantSettings(faq_artifact_dir=str(tmp_path / "faq"), tts_cache_dir=str(tmp_path / "tts")))
+    assert service.answer("Where do you work?", TEXT_ONLY, tenant=alice)["answer"] == "At the port of Hamburg."
+    assert service.answer("Where do you work?", TEXT_ONLY, tenant=bob)["answer"] == "At a bakery in Bremen."
+
+
+def test_editing_tenant_json_reloads_the_portfolio(tenants_dir):
+    assert get_tenant("bob", tenants_dir).name == "Bob Jones"
+    path = os.path.join(tenants_dir, "bob", "tenant.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"name": "Robert Jones", "voice_id": "voice-bob"}, f)
+    bob = get_tenant("bob", tenants_dir)
+    assert (bob.name, bob.voice_id) == ("Robert Jones", "voice-bob")
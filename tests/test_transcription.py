@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from assistant import AssistantService, AssistantSettings
+from transcription import IncrementalTranscriber, pcm_to_wav, read_wav, transcribe_wav_incrementally
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=8000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return b"\0\0" * int(seconds * RATE)
+
+
+class FakeWhisper:
+    def __init__(self):
+        self.uploads = []
+        self.audio = SimpleNamespace(transcriptions=self)
+
+    def create(self, model, file, timeout):
+        self.uploads.append(file)
+        return SimpleNamespace(text=f"part{len(self.uploads)}")
+
+
+def durations(uploads):
+    seconds = []
+    for wav in uploads:
+        pcm, _, _, rate = read_wav(wav)
+        seconds.append(len(pcm) / 2 / rate)
+    return seconds
+
+
+def test_segments_are_cut_at_pauses_and_trimmed():
+    uploads = []
+    wav = pcm_to_wav(tone(1.2) + silence(1.0) + tone(1.2) + silence(0.6), 1, 2, RATE)
+    text, metrics = transcribe_wav_incrementally(wav, lambda w: uploads.append(w) or "x")
+    assert text == "x x"
+    assert metrics["segments"] == 2
+    # Each upload is the speech plus at most the short pad on either side
+    assert all(1.2 <= d <= 1.2 + 0.25 for d in durations(uploads))
+
+
+def test_silent_recordings_are_never_uploaded():
+    uploads = []
+    transcriber = IncrementalTranscriber(lambda w: uploads.append(w) or "hallucinated", RATE,
+                                         executor=ThreadPoolExecutor(1))
+    transcriber.feed(silence(2.0))
+    assert transcriber.finish() == ""
+    assert uploads == []
+    assert transcriber.metrics["silent_segments"] >= 1
+
+
+def test_non_wav_recordings_are_uploaded_with_their_own_name_and_type(tmp_path, monkeypatch):
+    service = AssistantService(AssistantSettings(tts_cache_dir=str(tmp_path)))
+    whisper = FakeWhisper()
+    monkeypatch.setattr(service, "_openai", lambda: whisper)
+    text, metrics = service.transcribe(("question.webm", b"\x1aE\xdf\xa3webm", "audio/webm"))
+    assert (text, metrics) == ("part1", None)
+    assert whisper.uploads == [("question.webm", b"\x1aE\xdf\xa3webm", "audio/webm")]
+
+
+def test_wav_recordings_are_uploaded_segment_by_segment(tmp_path, monkeypatch):
+    service = AssistantService(AssistantSettings(tts_cache_dir=str(tmp_path)))
+    whisper = FakeWhisper()
+    monkeypatch.setattr(service, "_openai", lambda: whisper)
+    wav = pcm_to_wav(tone(1.2) + silence(1.0) + tone(1.2), 1, 2, RATE)
+    text, metrics = service.transcribe(("audio.wav", wav, "audio/wav"))
+    assert sorted(text.split()) == ["part1", "part2"]
+    assert metrics["segments"] == 2
+    assert all(name == "speech.wav" and mime == "audio/wav" for name, _, mime in whisper.uploads)
@@ -0,0 +1,143 @@
+"""Speech-to-text for voice questions.
+
+Audio is uploaded straight from memory (no temp files). For longer
+recordings, ``IncrementalTranscriber`` cuts the PCM stream at pauses and
+transcribes each finished segment on a worker pool while later audio is
+still arriving, so only the last segment is outstanding once the speaker
+stops. Leading and trailing silence is trimmed and silent segments are
+never uploaded, since Whisper tends to invent text for silence.
+"""
+import io
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from providers import call_with_retries
+from shared import process_wide
+
+WHISPER_MODEL = "whisper-1"
+TRANSCRIBE_WORKERS = 4
+FRAME_SECONDS = 0.02
+SILENCE_RMS = 500  # 16-bit amplitude below which a frame counts as silence
+MIN_SILENCE_SECONDS = 0.4
+MIN_SEGMENT_SECONDS = 1.0
+SILENCE_PAD_SECONDS = 0.1  # silence kept around speech when a segment is trimmed
+
+
+def openai_transcribe(audio_bytes, client, model=WHISPER_MODEL, filename="speech.wav", mime="audio/wav", timeout=30):
+    """Transcribe an in-memory audio file with Whisper and return the text."""
+    transcript = call_with_retries("openai", lambda: client.audio.transcriptions.create(
+        model=model,
+        file=(filename, audio_bytes, mime),
+        timeout=timeout,
+    ))
+    return transcript.text
+
+
+def read_wav(wav_bytes):
+    """Return (pcm_bytes, channels, sample_width, frame_rate) for a WAV file."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as w:
+        return w.readframes(w.getnframes()), w.getnchannels(), w.getsampwidth(), w.getframerate()
+
+
+def pcm_to_wav(pcm, channels, sample_width, frame_rate):
+    out = io.BytesIO()
+    with wave.open(out, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(sample_width)
+        w.setframerate(frame_rate)
+        w.writeframes(pcm)
+    return out.getvalue()
+
+
+def get_transcribe_executor(max_workers=TRANSCRIBE_WORKERS):
+    return process_wide("stt_executor", lambda n: ThreadPoolExecutor(max_workers=n, thread_name_prefix="stt"), max_workers)
+
+
+class IncrementalTranscriber:
+    """Splits streamed 16-bit PCM at pauses and transcribes segments as they close.
+
+    ``transcribe`` takes WAV bytes and returns text; it runs on worker
+    threads. ``metrics["latency_after_last_byte"]`` is the time from
+    ``finish()`` (the last audio byte) to the complete transcript.
+    """
+
+    def __init__(self, transcribe, frame_rate, channels=1, sample_width=2, executor=None,
+                 silence_rms=SILENCE_RMS, min_silence=MIN_SILENCE_SECONDS, min_segment=MIN_SEGMENT_SECONDS):
+        self.transcribe = transcribe
+        self.frame_rate = frame_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.executor = executor or get_transcribe_executor()
+        self.silence_rms = silence_rms
+        self.frame_bytes = int(frame_rate * FRAME_SECONDS) * channels * sample_width
+        self.min_silence_frames = max(1, int(min_silence / FRAME_SECONDS))
+        self.min_segment_bytes = int(min_segment * frame_rate) * channels * sample_width
+        self.pad_frames = int(SILENCE_PAD_SECONDS / FRAME_SECONDS)
+        self.metrics = {"segments": 0, "silent_segments": 0, "audio_seconds": 0.0, "latency_after_last_byte": None}
+        self._buffer = bytearray()
+        self._scanned = 0
+        self._silent_run = 0
+        self._futures = []
+
+    def _is_silent(self, frame):
+        if self.sample_width != 2:
+            return False
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return samples.size == 0 or float(np.sqrt(np.mean(samples * samples))) < self.silence_rms
+
+    def _trim(self, pcm):
+        """Drop leading and trailing silent frames (keeping a short pad); empty if all silent."""
+        n = -(-len(pcm) // self.frame_bytes)
+        voiced = [i for i in range(n) if not self._is_silent(pcm[i * self.frame_bytes:(i + 1) * self.frame_bytes])]
+        if not voiced:
+            return b""
+        start = max(0, voiced[0] - self.pad_frames) * self.frame_bytes
+        end = min(n, voiced[-1] + 1 + self.pad_frames) * self.frame_bytes
+        return pcm[start:end]
+
+    def _submit(self, pcm):
+        if not pcm:
+            return
+        pcm = self._trim(pcm)
+        if not pcm:
+            self.metrics["silent_segments"] += 1
+            return
+        self.metrics["segments"] += 1
+        wav = pcm_to_wav(bytes(pcm), self.channels, self.sample_width, self.frame_rate)
+        self._futures.append(self.executor.submit(self.transcribe, wav))
+
+    def feed(self, pcm_chunk):
+        """Add audio; segments that end in a pause are sent for transcription."""
+        self._buffer.extend(pcm_chunk)
+        self.metrics["audio_seconds"] += len(pcm_chunk) / (self.frame_rate * self.channels * self.sample_width)
+        while self._scanned + self.frame_bytes <= len(self._buffer):
+            frame = self._buffer[self._scanned:self._scanned + self.frame_bytes]
+            self._scanned += self.frame_bytes
+            self._silent_run = self._silent_run + 1 if self._is_silent(frame) else 0
+            if self._silent_run >= self.min_silence_frames and self._scanned >= self.min_segment_bytes:
+                self._submit(self._buffer[:self._scanned])
+                del self._buffer[:self._scanned]
+                self._scanned = 0
+                self._silent_run = 0
+
+    def finish(self):
+        """Transcribe the remaining audio and return the full transcript."""
+        start = time.perf_counter()
+        self._submit(self._buffer)
+        self._buffer = bytearray()
+        texts = [f.result() for f in self._futures]
+        self.metrics["latency_after_last_byte"] = time.perf_counter() - start
+        return " ".join(t.strip() for t in texts if t and t.strip())
+
+
+def transcribe_wav_incrementally(wav_bytes, transcribe, chunk_seconds=0.5):
+    """Feed a recorded WAV through IncrementalTranscriber; returns (text, metrics)."""
+    pcm, channels, sample_width, frame_rate = read_wav(wav_bytes)
+    transcriber = IncrementalTranscriber(transcribe, frame_rate, channels, sample_width)
+    step = max(1, int(chunk_seconds * frame_rate)) * channels * sample_width
+    for i in range(0, len(pcm), step):
+        transcriber.feed(pcm[i:i + step])
+    return transcriber.finish(), transcriber.metrics